@@ -0,0 +1,66 @@
+"""
+Shared rendering of the sweep animations, one frame at a time.
+
+Places the scaled source image the way the generate_*_animation.py scripts
+do and dithers the result, so the preview server and frame_budget.py can
+render any frame of any animation without writing a frame directory first.
+Scaled sources and rendered frames are kept in LRU caches keyed by their
+parameters (including the source's mtime, so edits invalidate them).
+"""
+
+import io
+from functools import lru_cache
+
+from PIL import Image
+
+from convert_to_1bit import floyd_steinberg_dither
+from preprocess import load_scaled
+
+FLIPPER_WIDTH = 128
+FLIPPER_HEIGHT = 64
+
+ANIMATIONS = ("up", "down", "bottom_through_top", "top_through_bottom")
+
+
+def frame_y(kind, frame_num, num_frames, scaled_height):
+    """Y offset of the scaled image for one frame, as the generators place it"""
+    center_y = (FLIPPER_HEIGHT - scaled_height) // 2
+
+    if kind in ("up", "down"):
+        # generate_sweep_animation.py (from top) / _down.py (from bottom)
+        start_y = -scaled_height if kind == "up" else FLIPPER_HEIGHT
+        progress = frame_num / (num_frames - 1)
+        return int(start_y + (center_y - start_y) * progress)
+
+    # generate_through_animations.py: enter to center, then exit
+    half = num_frames // 2
+    enter_y = FLIPPER_HEIGHT if kind == "bottom_through_top" else -scaled_height
+    exit_y = -scaled_height if kind == "bottom_through_top" else FLIPPER_HEIGHT
+    if frame_num < half:
+        progress = frame_num / (half - 1)
+        return int(enter_y + (center_y - enter_y) * progress)
+    progress = (frame_num - half) / (half - 1)
+    return int(center_y + (exit_y - center_y) * progress)
+
+
+@lru_cache(maxsize=8)
+def scaled_source(path, mtime_ns, width=FLIPPER_WIDTH):
+    """
+    Source image (or preprocess.py recipe) scaled to the display width.
+
+    Backed by the on-disk preprocessing cache, so a restart doesn't redo
+    the resize either; mtime_ns keys invalidation of this in-memory layer.
+    """
+    return load_scaled(path, width)
+
+
+@lru_cache(maxsize=2048)
+def render_frame(path, mtime_ns, kind, num_frames, frame_num):
+    """Render one dithered frame and return it as PNG bytes"""
+    source = scaled_source(path, mtime_ns)
+    frame = Image.new("RGBA", (FLIPPER_WIDTH, FLIPPER_HEIGHT), (255, 255, 255, 0))
+    frame.paste(source, (0, frame_y(kind, frame_num, num_frames, source.size[1])), source)
+
+    buffer = io.BytesIO()
+    floyd_steinberg_dither(frame).save(buffer, "PNG")
+    return buffer.getvalue()
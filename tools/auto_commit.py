@@ -4,12 +4,25 @@ Auto-commit script that periodically asks Claude to commit and push changes.
 
 Usage:
     uv run tools/auto_commit.py [--interval SECONDS]
+    uv run tools/auto_commit.py --watch [--debounce SECONDS]
 
 This script runs in a loop, checking for changes and using Claude Code CLI
-to commit and push them automatically.
+to commit and push them automatically. With --watch it sleeps on Linux
+inotify events instead and commits once edits have settled, falling back to
+interval polling where inotify isn't available.
+
+Change detection and committing run as separate asyncio tasks: while a
+commit is in flight, new changes are queued and picked up by the next
+cycle. Each cycle appends a metrics record to tools/auto_commit_metrics.jsonl.
 """
 
-import subprocess
+import argparse
+import asyncio
+import ctypes
+import ctypes.util
+import json
+import os
+import struct
 import time
 import sys
 from datetime import datetime
@@ -17,49 +30,108 @@ from pathlib import Path
 
 # Configuration
 DEFAULT_INTERVAL = 300  # 5 minutes in seconds
+DEFAULT_DEBOUNCE = 5  # seconds without file events before committing
+MAX_SETTLE = 60  # commit anyway if edits never pause for this long
+COMMIT_TIMEOUT = 120  # 2 minutes
 LOG_FILE = Path("tools/auto_commit.log")
+METRICS_FILE = Path("tools/auto_commit_metrics.jsonl")
+
+_log_handle = None  # kept open for the lifetime of the process
 
 
 def log(message: str, level: str = "INFO"):
     """Log a message to both stdout and log file."""
+    global _log_handle
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     log_entry = f"[{timestamp}] [{level}] {message}"
 
     print(log_entry)
 
-    # Append to log file
-    with open(LOG_FILE, "a") as f:
-        f.write(log_entry + "\n")
-
-
-def check_git_status() -> tuple[bool, str]:
-    """Check if there are uncommitted changes."""
-    try:
-        result = subprocess.run(
-            ["git", "status", "--porcelain"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        has_changes = bool(result.stdout.strip())
-        return has_changes, result.stdout
-    except subprocess.CalledProcessError as e:
-        log(f"Error checking git status: {e}", "ERROR")
-        return False, ""
-
-
-def get_recent_commits(count: int = 5) -> str:
-    """Get recent commit messages."""
+    # Append to log file (line-buffered, so entries land immediately)
+    if _log_handle is None:
+        _log_handle = open(LOG_FILE, "a", buffering=1)
+    _log_handle.write(log_entry + "\n")
+
+
+def write_metrics(record: dict):
+    """Append one cycle's metrics as a JSON line."""
+    with open(METRICS_FILE, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+async def run_git(*args: str, stdin: str | None = None) -> tuple[int, str]:
+    """Run a git command without blocking the event loop."""
+    proc = await asyncio.create_subprocess_exec(
+        "git", *args,
+        stdin=asyncio.subprocess.PIPE if stdin is not None else None,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    stdout, _ = await proc.communicate(stdin.encode() if stdin is not None else None)
+    return proc.returncode, stdout.decode()
+
+
+async def check_git_status() -> tuple[str, list[str]]:
+    """
+    Return (HEAD hash, changed paths) from a single git process.
+
+    `status --porcelain=v2 --branch` reports the current commit alongside
+    the changes, replacing separate rev-parse and status calls. It can run
+    while claude is committing, so it must not take the index lock.
+    """
+    code, output = await run_git("--no-optional-locks", "status", "--porcelain=v2",
+                                 "--branch", "--untracked-files=all")
+    if code != 0:
+        log("Error checking git status", "ERROR")
+        return "", []
+
+    head = ""
+    changes = []
+    for line in output.splitlines():
+        if line.startswith("# branch.oid "):
+            head = line.split(" ", 2)[2]
+            continue
+        if line.startswith("1 "):
+            path = line.split(" ", 8)[8]
+        elif line.startswith("2 "):
+            path = line.split(" ", 9)[9].split("\t")[0]
+        elif line.startswith("u "):
+            path = line.split(" ", 10)[10]
+        elif line.startswith(("? ", "! ")):
+            path = line[2:]
+        else:
+            continue
+        # Our own log and metrics files change every cycle; committing them
+        # would start another cycle
+        if Path(path) not in (LOG_FILE, METRICS_FILE):
+            changes.append(path)
+    return head, changes
+
+
+async def get_recent_commits(count: int = 5) -> tuple[str, str]:
+    """Return (HEAD hash, recent commit subjects) from a single git process."""
+    code, output = await run_git("log", f"-{count}", "--pretty=format:%H %s")
+    if code != 0:
+        return "", ""
+    lines = output.splitlines()
+    head = lines[0].split(" ", 1)[0] if lines else ""
+    subjects = "\n".join(line.split(" ", 1)[1] if " " in line else "" for line in lines)
+    return head, subjects
+
+
+async def filter_ignored(paths: set[str]) -> set[str]:
+    """Drop .gitignore'd paths and our own log files (one git process per batch)."""
+    paths = {p for p in paths if Path(p) not in (LOG_FILE, METRICS_FILE)}
+    if not paths:
+        return paths
     try:
-        result = subprocess.run(
-            ["git", "log", f"-{count}", "--pretty=format:%s"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        return result.stdout
-    except subprocess.CalledProcessError:
-        return ""
+        # Exit code 1 just means nothing was ignored
+        _, output = await run_git("check-ignore", "--stdin", "-z",
+                                  stdin="\0".join(sorted(paths)) + "\0")
+    except OSError as e:
+        log(f"Error checking ignored paths: {e}", "ERROR")
+        return paths
+    return paths - set(filter(None, output.split("\0")))
 
 
 def extract_important_notes(text: str) -> list[str]:
@@ -79,58 +151,42 @@ def extract_important_notes(text: str) -> list[str]:
     return notes
 
 
-def run_claude_commit_push() -> bool:
+async def run_claude_commit_push(before_hash: str) -> bool:
     """Run claude CLI to commit and push changes."""
     try:
-        # Capture commit hash before running Claude
-        before_result = subprocess.run(
-            ["git", "rev-parse", "HEAD"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        before_hash = before_result.stdout.strip()
-
         # Run claude CLI with the commit push command (suppress verbose output)
-        result = subprocess.run(
-            ["claude", "commit push"],
-            capture_output=True,
-            text=True,
-            timeout=120  # 2 minute timeout
+        proc = await asyncio.create_subprocess_exec(
+            "claude", "commit push",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
         )
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), COMMIT_TIMEOUT)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            log(f"Timed out after {COMMIT_TIMEOUT} seconds", "ERROR")
+            return False
 
         # Check if successful
-        if result.returncode == 0:
-            # Get new commit messages
-            after_result = subprocess.run(
-                ["git", "rev-parse", "HEAD"],
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            after_hash = after_result.stdout.strip()
-
+        if proc.returncode == 0:
             # If commits were made, show them
-            if before_hash != after_hash:
-                commits = get_recent_commits(5)
-                if commits:
-                    print(commits)
+            after_hash, commits = await get_recent_commits(5)
+            if before_hash != after_hash and commits:
+                print(commits)
 
             # Extract and show any important notes
-            notes = extract_important_notes(result.stdout)
+            notes = extract_important_notes(stdout.decode())
             if notes:
                 print("\n" + "\n".join(notes))
 
             return True
         else:
-            log(f"Commit failed (code {result.returncode})", "ERROR")
-            if result.stderr:
-                print(result.stderr)
+            log(f"Commit failed (code {proc.returncode})", "ERROR")
+            if stderr:
+                print(stderr.decode())
             return False
 
-    except subprocess.TimeoutExpired:
-        log("Timed out after 2 minutes", "ERROR")
-        return False
     except FileNotFoundError:
         log("'claude' CLI not found", "ERROR")
         return False
@@ -139,29 +195,257 @@ def run_claude_commit_push() -> bool:
         return False
 
 
-def main():
-    """Main loop that periodically commits and pushes."""
-    # Parse interval from command line
-    interval = DEFAULT_INTERVAL
-    if len(sys.argv) > 1 and sys.argv[1] == "--interval":
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM
+              | IN_MOVED_TO | IN_CREATE | IN_DELETE)
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class InotifyWatcher:
+    """Recursive Linux inotify watch over a work tree via ctypes."""
+
+    def __init__(self, root: Path):
+        libc_name = ctypes.util.find_library("c")
+        if sys.platform != "linux" or not libc_name:
+            raise OSError("inotify is only available on Linux")
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.root = root
+        self.dirs: dict[int, Path] = {}
+        self.new_dirs: list[Path] = []  # created since the last add_new_dirs()
+
+    async def add_tree(self, top: Path):
+        """Watch top and every non-ignored directory below it."""
+        candidates = []
+        for dirpath, dirnames, _ in os.walk(top):
+            dirnames[:] = [d for d in dirnames if d != ".git"]
+            candidates.append(os.path.relpath(dirpath, self.root))
+        ignored = set(candidates) - await filter_ignored(set(candidates))
+        for rel in candidates:
+            if any(rel == i or rel.startswith(i + os.sep) for i in ignored):
+                continue
+            path = self.root / rel
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+            if wd >= 0:
+                self.dirs[wd] = path
+
+    async def add_new_dirs(self):
+        """Start watching directories created since the last call."""
+        new_dirs, self.new_dirs = self.new_dirs, []
+        for path in new_dirs:
+            await self.add_tree(path)
+
+    def read_events(self) -> set[str]:
+        """Return work-tree-relative paths from all pending events."""
+        paths = set()
         try:
-            interval = int(sys.argv[2])
-        except (IndexError, ValueError):
-            print("Invalid interval, using default 300 seconds")
-
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return paths
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                paths.add(".")  # lost events: treat as "something changed"
+                continue
+            if mask & IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            parent = self.dirs.get(wd)
+            if parent is None:
+                continue
+            path = parent / os.fsdecode(name) if name else parent
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                self.new_dirs.append(path)
+            paths.add(os.path.relpath(path, self.root))
+        return paths
+
+    def close(self):
+        os.close(self.fd)
+
+
+class ChangeQueue:
+    """
+    Latest pending change set.
+
+    Detection keeps adding to it while a commit is in flight; the committer
+    takes the whole accumulated set at once, so back-to-back edits collapse
+    into one follow-up cycle instead of piling up.
+
+    A poller that has just run `git status` passes its (HEAD, changes) along
+    so the committer doesn't run it again. A status taken before the last
+    commit finished is stale and is dropped.
+    """
+
+    def __init__(self):
+        self.paths: set[str] = set()
+        self.first_seen: float | None = None
+        self.detected: float | None = None
+        self.status: tuple[str, list[str]] | None = None
+        self.status_time = 0.0
+        self.last_commit = 0.0
+        self.event = asyncio.Event()
+
+    def put(self, paths: set[str], first_seen: float,
+            status: tuple[str, list[str]] | None = None, checked: float = 0.0):
+        self.paths |= paths
+        if self.first_seen is None:
+            self.first_seen = first_seen
+            self.detected = time.monotonic()
+        self.status, self.status_time = status, checked
+        self.event.set()
+
+    def commit_done(self):
+        self.last_commit = time.monotonic()
+
+    async def take(self) -> tuple[set[str], float, float, tuple[str, list[str]] | None]:
+        await self.event.wait()
+        self.event.clear()
+        status = self.status if self.status_time > self.last_commit else None
+        paths, first_seen, detected = self.paths, self.first_seen, self.detected
+        self.paths, self.first_seen, self.detected, self.status = set(), None, None, None
+        return paths, first_seen, detected, status
+
+
+async def committer(queue: ChangeQueue):
+    """Run one commit cycle per queued change set, recording metrics."""
+    cycle = 0
+    failures = 0
+    while True:
+        paths, first_seen, detected, status = await queue.take()
+
+        # Watch mode (or a stale poll) needs a fresh status
+        head, changes = status or await check_git_status()
+        if not changes:
+            continue
+
+        cycle += 1
+        started = time.monotonic()
+        ok = await run_claude_commit_push(head)
+        duration = time.monotonic() - started
+        queue.commit_done()
+        failures += not ok
+
+        write_metrics({
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "cycle": cycle,
+            "changed_files": len(changes),
+            "detect_latency_s": round(detected - first_seen, 3),
+            "queue_wait_s": round(started - detected, 3),
+            "commit_duration_s": round(duration, 3),
+            "success": ok,
+            "failures_total": failures,
+        })
+
+
+async def poll_changes(queue: ChangeQueue, interval: int):
+    """Queue a change set every interval seconds while git reports changes."""
     minutes = interval / 60
     print(f"Started (checking every {minutes:.1f} minutes, Ctrl+C to stop)")
 
+    while True:
+        checked = time.monotonic()
+        head, changes = await check_git_status()
+        if changes:
+            # Changes happened somewhere in the last interval; count from the check
+            queue.put(set(changes), checked, (head, changes), checked)
+
+        # Wait for next iteration
+        await asyncio.sleep(interval)
+
+
+async def watch_changes(queue: ChangeQueue, watcher: InotifyWatcher, debounce: float):
+    """Queue a change set once inotify events have settled for debounce seconds."""
+    loop = asyncio.get_running_loop()
+    ready = asyncio.Event()
+    loop.add_reader(watcher.fd, ready.set)
+
+    print(f"Started (watching {len(watcher.dirs)} directories, "
+          f"committing {debounce:g}s after edits settle, Ctrl+C to stop)")
+
+    # Pick up anything changed while we weren't running
+    queue.put({"."}, time.monotonic())
+
     try:
         while True:
-            # Check for changes
-            has_changes, _ = check_git_status()
+            await ready.wait()
+            ready.clear()
+            first_seen = time.monotonic()
+            paths = watcher.read_events()
+
+            while time.monotonic() - first_seen < MAX_SETTLE:
+                try:
+                    await asyncio.wait_for(ready.wait(), debounce)
+                except asyncio.TimeoutError:
+                    break
+                ready.clear()
+                paths |= watcher.read_events()
+
+            await watcher.add_new_dirs()
+            paths = await filter_ignored(paths)
+            if paths:
+                queue.put(paths, first_seen)
+    finally:
+        loop.remove_reader(watcher.fd)
+
+
+async def run(args):
+    """Run change detection and committing concurrently."""
+    queue = ChangeQueue()
+    watcher = None
+
+    if args.watch:
+        try:
+            watcher = InotifyWatcher(Path.cwd())
+            await watcher.add_tree(Path.cwd())
+        except OSError as e:
+            log(f"inotify unavailable ({e}), falling back to polling", "WARN")
+            watcher = None
+
+    if watcher:
+        detector = watch_changes(queue, watcher, args.debounce)
+    else:
+        detector = poll_changes(queue, args.interval)
+
+    try:
+        await asyncio.gather(detector, committer(queue))
+    finally:
+        if watcher:
+            watcher.close()
 
-            if has_changes:
-                run_claude_commit_push()
 
-            # Wait for next iteration
-            time.sleep(interval)
+def main():
+    """Main loop that commits and pushes on a timer or on file changes."""
+    parser = argparse.ArgumentParser(description="Periodically commit and push changes with Claude")
+    parser.add_argument("--interval", type=int, default=DEFAULT_INTERVAL,
+                        help=f"Polling interval in seconds (default: {DEFAULT_INTERVAL})")
+    parser.add_argument("--watch", action="store_true",
+                        help="Commit on file changes (inotify) instead of polling")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE,
+                        help=f"Seconds without changes before committing in --watch mode (default: {DEFAULT_DEBOUNCE})")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run(args))
 
     except KeyboardInterrupt:
         print("\nStopped")
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# /// script
+# dependencies = [
+#   "pillow",
+# ]
+# ///
+
+"""
+Benchmark the hot paths of every tool against a JSON baseline.
+
+Covers .sub parsing, calculate_timestamps, trim_signal, raw_to_wav,
+generate_c_array, floyd_steinberg_dither, frame generation and
+create_animated_gif on synthetic captures and frame sets. Each case records
+wall time (best of N) and peak memory: the growth of peak RSS during a run
+in a freshly spawned interpreter, so the result doesn't depend on which
+cases ran before it, and Pillow's C-side image buffers count as well as the
+Python heap. Times under MIN_TIME_S and growth under MIN_PEAK_BYTES are mostly
+scheduler and allocator noise, so regressions are judged against at least
+that much.
+
+The committed baseline (tools/benchmark_baseline.json) holds the quick
+sizes and is what CI compares against; timings are machine-specific, so
+re-record it with --update on the CI runner's hardware when that changes.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import resource
+import tempfile
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from trim_sub import parse_sub_file, calculate_timestamps, trim_signal, write_sub_file
+from sub_to_wav import raw_to_wav
+from sub_to_c_array import generate_c_array
+from sub_stats import capture_stats
+
+DEFAULT_BASELINE = "tools/benchmark_baseline.json"
+DEFAULT_THRESHOLD = 0.25  # 25% slower / larger than baseline fails
+MIN_TIME_S = 0.01  # time floor for comparisons; shorter runs are mostly noise
+MIN_PEAK_BYTES = 1 << 20  # memory floor for comparisons; smaller peaks are noise
+RSS_UNIT = 1 if sys.platform == "darwin" else 1024  # ru_maxrss: bytes on macOS, KiB on Linux
+
+SOURCE_IMAGE = "images/casino.png"
+
+
+def synthetic_capture(count, seed=0):
+    """Alternating ON/OFF timings with a realistic mix of pulse widths"""
+    rng = random.Random(seed)
+    widths = [65, 100, 330, 360, 700, 720, 1100, 5000]
+    return [rng.choice(widths) * (1 if i % 2 else -1) for i in range(count)]
+
+
+class Benchmark:
+    """A named hot path measured at several input sizes"""
+
+    def __init__(self, name, quick_sizes, full_sizes, setup, run):
+        self.name = name
+        self.quick_sizes = quick_sizes
+        self.full_sizes = full_sizes
+        self.setup = setup  # (size, tmpdir) -> state
+        self.run = run      # state -> None
+
+
+def setup_sub_file(size, tmpdir):
+    path = os.path.join(tmpdir, f"capture_{size}.sub")
+    if not os.path.exists(path):
+        header = [
+            "Filetype: Flipper SubGhz RAW File",
+            "Version: 1",
+            "Frequency: 433920000",
+            "Preset: FuriHalSubGhzPresetOok650Async",
+            "Protocol: RAW",
+        ]
+        write_sub_file(path, header, synthetic_capture(size))
+    return path
+
+
+def setup_raw(size, tmpdir):
+    return synthetic_capture(size)
+
+
+def setup_trim(size, tmpdir):
+    raw_data = synthetic_capture(size)
+    total = sum(abs(t) for t in raw_data)
+    return raw_data, total // 4, total * 3 // 4
+
+
+def setup_wav(size, tmpdir):
+    return synthetic_capture(size), os.path.join(tmpdir, "out.wav")
+
+
+def setup_dither(size, tmpdir):
+    from PIL import Image
+    source = Image.open(SOURCE_IMAGE).convert("L").resize((128, 64))
+    return [source.copy() for _ in range(size)]
+
+
+def run_dither(frames):
+    from convert_to_1bit import floyd_steinberg_dither
+    for frame in frames:
+        floyd_steinberg_dither(frame)
+
+
+def setup_frames_out(size, tmpdir):
+    return size, os.path.join(tmpdir, f"frames_{size}")
+
+
+def run_generate_frames(state):
+    from generate_sweep_animation import generate_sweep_animation
+    size, out_dir = state
+    generate_sweep_animation(SOURCE_IMAGE, out_dir, num_frames=size)
+
+
+def setup_gif(size, tmpdir):
+    frames_dir = os.path.join(tmpdir, f"gif_frames_{size}")
+    if not os.path.isdir(frames_dir):
+        from generate_sweep_animation import generate_sweep_animation
+        generate_sweep_animation(SOURCE_IMAGE, frames_dir, num_frames=size)
+    return frames_dir, os.path.join(tmpdir, "preview.gif")
+
+
+def run_gif(state):
+    from create_preview_gif import create_animated_gif
+    frames_dir, output = state
+    create_animated_gif(frames_dir, output)
+
+
+def setup_store(size, tmpdir):
+    from frame_store import import_png_dir
+    frames_dir, _ = setup_gif(size, tmpdir)
+    path = os.path.join(tmpdir, f"store_{size}.frames")
+    if not os.path.exists(path):
+        import_png_dir(frames_dir, path)
+    return path
+
+
+def run_read_store(path):
+    from frame_store import FrameStore
+    with FrameStore(path) as store:
+        for index in range(len(store)):
+            store.image(index)
+
+
+BENCHMARKS = [
+    Benchmark("parse_sub_file", [10_000, 100_000], [10_000, 100_000, 1_000_000, 10_000_000],
+              setup_sub_file, parse_sub_file),
+    Benchmark("capture_stats", [10_000, 100_000], [10_000, 100_000, 1_000_000, 10_000_000],
+              setup_sub_file, capture_stats),
+    Benchmark("calculate_timestamps", [10_000, 1_000_000], [10_000, 1_000_000, 10_000_000, 20_000_000],
+              setup_raw, calculate_timestamps),
+    Benchmark("trim_signal", [10_000, 1_000_000], [10_000, 1_000_000, 10_000_000, 20_000_000],
+              setup_trim, lambda s: trim_signal(*s)),
+    Benchmark("raw_to_wav", [1_000, 10_000], [1_000, 10_000, 100_000],
+              setup_wav, lambda s: raw_to_wav(*s)),
+    Benchmark("generate_c_array", [10_000, 100_000], [10_000, 100_000, 1_000_000, 10_000_000],
+              setup_raw, lambda s: generate_c_array("bench_raw", s)),
+    Benchmark("floyd_steinberg_dither", [10], [10, 100, 1000],
+              setup_dither, run_dither),
+    Benchmark("generate_frames", [100], [100, 1000],
+              setup_frames_out, run_generate_frames),
+    Benchmark("create_animated_gif", [100], [100, 1000],
+              setup_gif, run_gif),
+    Benchmark("read_frame_store", [100], [100, 1000],
+              setup_store, run_read_store),
+]
+
+
+def rss_growth_in_fork(run, state):
+    """Bytes the peak RSS grows by while run(state) executes in a forked child"""
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            os.close(read_fd)
+            # A fresh child's high-water mark starts at its current RSS
+            before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            run(state)
+            after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            os.write(write_fd, str((after - before) * RSS_UNIT).encode())
+            status = 0
+        finally:
+            os._exit(status)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd) as f:
+        output = f.read()
+    _, status = os.waitpid(pid, 0)
+    if status or not output:
+        raise RuntimeError(f"memory run failed (wait status {status})")
+    return int(output)
+
+
+def peak_rss_growth(name, size, tmpdir):
+    """
+    Peak RSS growth of one case, run in a freshly spawned interpreter.
+
+    Measuring in the benchmark process would reuse heap that earlier cases
+    (or the timed runs) left behind and report less the later a case runs;
+    the fork after setup keeps the setup's own peak out of the result.
+    """
+    bench = next(b for b in BENCHMARKS if b.name == name)
+    with contextlib.redirect_stdout(io.StringIO()):
+        state = bench.setup(size, tmpdir)
+        return rss_growth_in_fork(bench.run, state)
+
+
+def measure(bench, size, tmpdir, repeat):
+    """Return {'time_s', 'peak_bytes'} for one benchmark case"""
+    # Tools print progress; keep it out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+            peak = pool.submit(peak_rss_growth, bench.name, size, tmpdir).result()
+
+        state = bench.setup(size, tmpdir)
+
+        best = None
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            bench.run(state)
+            elapsed = time.perf_counter() - t0
+            best = elapsed if best is None else min(best, elapsed)
+
+    return {'time_s': best, 'peak_bytes': peak}
+
+
+def compare(results, baseline, threshold):
+    """Return list of regression messages vs baseline"""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        for metric in ('time_s', 'peak_bytes'):
+            # Tiny (or zero) baselines are checked against the floor instead
+            limit = max(base[metric], MIN_PEAK_BYTES if metric == 'peak_bytes' else MIN_TIME_S)
+            if limit and result[metric] > limit * (1 + threshold):
+                change = result[metric] / limit - 1
+                regressions.append(f"{key} {metric}: {base[metric]:.4g} → {result[metric]:.4g} (+{change:.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark tool hot paths and check against a baseline',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+Examples:
+  # Quick run, compare with the stored baseline
+  uv run tools/benchmark.py
+
+  # Full size range (up to tens of millions of pulses, 1000 frames)
+  uv run tools/benchmark.py --full
+
+  # Record a new baseline
+  uv run tools/benchmark.py --update
+
+  # Only the signal benchmarks
+  uv run tools/benchmark.py -k trim -k parse
+
+Run from the repository root. Exits with status 1 on regressions, and on a
+missing baseline with --require-baseline (the default when $CI is set).
+CI compares against the committed tools/benchmark_baseline.json (quick
+sizes); re-record it with --update when the runner's hardware changes.
+        '''
+    )
+    parser.add_argument('--full', action='store_true',
+                       help='Use the full size range (slow, needs several GB of RAM)')
+    parser.add_argument('-k', dest='filters', action='append', default=[],
+                       help='Only run benchmarks whose name contains this (repeatable)')
+    parser.add_argument('--repeat', type=int, default=3,
+                       help='Timed runs per case; the best is kept (default: 3)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                       help=f'Baseline JSON file (default: {DEFAULT_BASELINE})')
+    parser.add_argument('--update', action='store_true',
+                       help='Write results to the baseline instead of comparing')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                       help=f'Allowed relative regression (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--require-baseline', action='store_true', default=bool(os.environ.get('CI')),
+                       help='Fail when there is no baseline to compare with (default: on when $CI is set)')
+
+    args = parser.parse_args()
+
+    selected = [b for b in BENCHMARKS
+                if not args.filters or any(f in b.name for f in args.filters)]
+    if not selected:
+        parser.error("no benchmarks match the given -k filters")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for bench in selected:
+            for size in (bench.full_sizes if args.full else bench.quick_sizes):
+                key = f"{bench.name}[{size}]"
+                result = measure(bench, size, tmpdir, args.repeat)
+                results[key] = result
+                print(f"  {key:36} {result['time_s'] * 1000:10.2f} ms  "
+                      f"{result['peak_bytes'] / 1024 / 1024:8.2f} MB")
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f).get('results', {})
+
+    if args.update:
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'results': baseline,
+            }, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"\n💾 Wrote {len(results)} results to {args.baseline}")
+        return
+
+    if not baseline:
+        if args.require_baseline:
+            print(f"\n❌ No baseline at {args.baseline} (record one with --update)")
+            sys.exit(1)
+        print(f"\n⚠️  No baseline at {args.baseline} (record one with --update)")
+        return
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for message in regressions:
+            print(f"   {message}")
+        sys.exit(1)
+
+    print(f"\n✅ No regressions beyond {args.threshold:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Build one continuous RAW stream from a playlist of .sub signals
+
+Each playlist entry is a signal with a repeat count and an inter-burst gap.
+Unique signals are stored once; repeats become a loop descriptor instead of
+copied data, and silence at the seams (trailing OFF + gap + leading OFF) is
+merged into a single OFF period. Output is either an expanded .sub file or a
+C header with the shared timing array plus its loop descriptors, so the
+firmware can play the whole playlist from a single TX session.
+"""
+
+import sys
+import argparse
+
+from trim_sub import parse_sub_file, write_sub_file
+from sub_to_c_array import generate_c_array
+from tx_emulator import DEFAULT_MIN_PULSE_US, LoopSource, emulate, print_report
+from profiling import stage, add_profile_args, profile_session
+
+
+def parse_entry(spec):
+    """Parse 'file.sub[:repeat[:gap_us]]' into (path, repeat, gap_us)"""
+    parts = spec.split(':')
+    path = parts[0]
+    repeat = int(parts[1]) if len(parts) > 1 and parts[1] else 1
+    gap_us = int(parts[2]) if len(parts) > 2 and parts[2] else 0
+
+    if repeat < 1:
+        raise ValueError(f"repeat must be >= 1 in '{spec}'")
+    if gap_us < 0:
+        raise ValueError(f"gap must be >= 0 in '{spec}'")
+
+    return path, repeat, gap_us
+
+
+def read_playlist(filename):
+    """Read entries from a playlist file: 'path [repeat [gap_us]]' per line"""
+    entries = []
+    with open(filename, 'r') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                entries.append(parse_entry(':'.join(line.split())))
+    return entries
+
+
+def split_silence(raw_data):
+    """
+    Split a timing array into (lead_us, core, tail_us).
+
+    lead/tail are the OFF periods before the first and after the last ON
+    pulse; core starts and ends with an ON pulse (empty if there is none).
+    """
+    start = 0
+    while start < len(raw_data) and raw_data[start] <= 0:
+        start += 1
+    if start == len(raw_data):
+        return sum(abs(t) for t in raw_data), [], 0
+
+    end = len(raw_data)
+    while raw_data[end - 1] <= 0:
+        end -= 1
+
+    lead_us = sum(abs(t) for t in raw_data[:start])
+    tail_us = sum(abs(t) for t in raw_data[end:])
+    return lead_us, raw_data[start:end], tail_us
+
+
+def build_playlist(entries):
+    """
+    Build the merged stream for a playlist.
+
+    Args:
+        entries: List of (path, repeat, gap_us)
+
+    Returns:
+        (data, loops, header) where data is the concatenated unique cores,
+        loops is a list of dicts with offset, count, repeat, gap_us
+        (OFF time between repetitions) and next_gap_us (OFF time after the
+        last repetition, merged with the next entry's leading silence),
+        and header is the .sub header of the first signal
+    """
+    data = []
+    segments = {}  # path -> (offset, count, lead_us, tail_us)
+    loops = []
+    header = None
+    pending_lead = 0  # silence from entries without ON pulses
+
+    for path, repeat, gap_us in entries:
+        if path not in segments:
+            file_header, raw_data = parse_sub_file(path)
+            if not raw_data:
+                raise ValueError(f"No RAW_Data found in {path}")
+            if header is None:
+                header = file_header
+            lead_us, core, tail_us = split_silence(raw_data)
+            segments[path] = (len(data), len(core), lead_us, tail_us)
+            data.extend(core)
+
+        offset, count, lead_us, tail_us = segments[path]
+
+        if count == 0:
+            # Pure silence: fold it into the seam before the next burst
+            pending_lead += (lead_us + gap_us) * repeat
+            continue
+
+        if loops:
+            loops[-1]['next_gap_us'] += pending_lead + lead_us
+        pending_lead = 0
+
+        loops.append({
+            'path': path,
+            'offset': offset,
+            'count': count,
+            'repeat': repeat,
+            'gap_us': tail_us + gap_us + lead_us,
+            'next_gap_us': tail_us + gap_us,
+        })
+
+    if loops:
+        loops[-1]['next_gap_us'] += pending_lead
+
+    return data, loops, header
+
+
+def expand_playlist(data, loops):
+    """Expand loop descriptors into a flat timing array (for .sub output)"""
+    expanded = []
+    for loop in loops:
+        core = data[loop['offset']:loop['offset'] + loop['count']]
+        for rep in range(loop['repeat']):
+            expanded.extend(core)
+            gap_us = loop['gap_us'] if rep < loop['repeat'] - 1 else loop['next_gap_us']
+            if gap_us:
+                expanded.append(-gap_us)
+    return expanded
+
+
+def generate_c_playlist(name, data, loops):
+    """Generate C array plus loop descriptor table"""
+    lines = [
+        "typedef struct {",
+        "    uint32_t offset;",
+        "    uint32_t count;",
+        "    uint32_t repeat;",
+        "    uint32_t gap_us;",
+        "    uint32_t next_gap_us;",
+        "} SignalLoop;",
+        "",
+        generate_c_array(f"{name}_raw", data),
+        "",
+        f"static const SignalLoop {name}_loops[] = {{",
+    ]
+    for loop in loops:
+        lines.append(
+            f"    {{{loop['offset']}, {loop['count']}, {loop['repeat']}, "
+            f"{loop['gap_us']}, {loop['next_gap_us']}}}, // {loop['path']}")
+    lines.append("};")
+    lines.append(f"static const size_t {name}_loops_count = {len(loops)};")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Build a merged, repeat-collapsed RAW stream from a signal playlist',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+Examples:
+  # Signal 1 three times with 20ms between bursts, then signal 2 once
+  python3 build_playlist.py signals/Cas_d_1_trimmed.sub:3:20000 signals/Cas_d_2_trimmed.sub -o combo.sub
+
+  # Same, as a C array with loop descriptors
+  python3 build_playlist.py signals/Cas_d_1_trimmed.sub:3:20000 signals/Cas_d_2_trimmed.sub --carray combo > combo.h
+
+  # Entries from a playlist file ("path repeat gap_us" per line)
+  python3 build_playlist.py -p combo.txt -o combo.sub
+
+Gaps are in microseconds (1 second = 1,000,000 microseconds)
+        '''
+    )
+
+    parser.add_argument('entries', nargs='*', help='Entries as file.sub[:repeat[:gap_us]]')
+    parser.add_argument('-p', '--playlist', help='Playlist file with one entry per line')
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('-o', '--output', help='Output expanded .sub file')
+    group.add_argument('--carray', metavar='NAME', help='Print a C array with loop descriptors')
+    parser.add_argument('--check', action='store_true',
+                       help='Run the playlist through the TX emulator')
+    parser.add_argument('--min-pulse', type=int, default=DEFAULT_MIN_PULSE_US,
+                       help=f'Minimum pulse for --check in microseconds (default: {DEFAULT_MIN_PULSE_US})')
+    add_profile_args(parser)
+
+    args = parser.parse_args()
+
+    try:
+        entries = [parse_entry(e) for e in args.entries]
+        if args.playlist:
+            entries.extend(read_playlist(args.playlist))
+    except ValueError as e:
+        parser.error(str(e))
+
+    if not entries:
+        parser.error("no playlist entries given")
+
+    # Status goes to stderr when the C array is printed to stdout
+    out = sys.stderr if args.carray else sys.stdout
+
+    with profile_session('build_playlist', args):
+        print(f"📡 Building playlist from {len(entries)} entries...", file=out)
+        try:
+            with stage('build'):
+                data, loops, header = build_playlist(entries)
+        except ValueError as e:
+            print(f"❌ {e}", file=out)
+            sys.exit(1)
+
+        if not loops:
+            print("❌ Playlist contains no ON pulses!", file=out)
+            sys.exit(1)
+
+        expanded_count = sum(loop['count'] * loop['repeat'] for loop in loops)
+        duration_us = sum(
+            sum(abs(t) for t in data[l['offset']:l['offset'] + l['count']]) * l['repeat']
+            + l['gap_us'] * (l['repeat'] - 1) + l['next_gap_us']
+            for l in loops)
+
+        print(f"   Unique timing values: {len(data)} (expanded: {expanded_count})", file=out)
+        print(f"   Loops: {len(loops)}", file=out)
+        print(f"   Total duration: {duration_us / 1_000_000:.3f} seconds ({duration_us:,} μs)", file=out)
+
+        if args.check:
+            print(file=out)
+            with stage('emulate'):
+                report = emulate(LoopSource(data, loops), args.min_pulse)
+            if not print_report("playlist", report, file=out):
+                sys.exit(1)
+
+        if args.carray:
+            print("// Auto-generated playlist")
+            for path, repeat, gap_us in entries:
+                print(f"// {path} x{repeat}, gap {gap_us} us")
+            print()
+            with stage('encode'):
+                print(generate_c_playlist(args.carray, data, loops))
+        else:
+            print(f"\n💾 Writing {args.output}...")
+            with stage('write'):
+                write_sub_file(args.output, header, expand_playlist(data, loops))
+            print("✅ Done!")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# /// script
+# dependencies = [
+#   "pillow",
+# ]
+# ///
+
+"""
+Build GIF previews straight from 1-bit animation frames.
+
+Unlike create_preview_gif.py this never converts frames to RGB or runs a
+palette optimisation pass: every frame is written with the same fixed
+black/white palette and streamed to the file as soon as it is read, so
+memory stays flat regardless of frame count. Several animation sets can be
+composed side by side, with labels, into one contact-sheet GIF.
+"""
+
+import os
+import sys
+import argparse
+
+from PIL import Image, ImageChops, ImageDraw, GifImagePlugin
+
+from frame_store import FrameStore, STORE_EXT, is_frame_store
+from profiling import stage, add_profile_args, profile_session
+
+FLIPPER_WIDTH = 128
+FLIPPER_HEIGHT = 64
+
+# Index 0 = black (pixel off), 1 = white (pixel on), as in the 1-bit PNGs
+PALETTE = [0, 0, 0, 255, 255, 255]
+THRESHOLD_LUT = [0] * 128 + [1] * 128
+
+LABEL_HEIGHT = 12
+SHEET_GAP = 4
+
+
+def list_frames(frames_dir):
+    """Return sorted frame_*.png paths in a directory"""
+    return sorted(
+        os.path.join(frames_dir, f)
+        for f in os.listdir(frames_dir)
+        if f.startswith('frame_') and f.endswith('.png')
+    )
+
+
+def to_palette_frame(image):
+    """Map a 1-bit (or any) frame to a 2-color 'P' image without quantizing"""
+    indices = image.convert('L').point(THRESHOLD_LUT)
+    frame = Image.frombytes('P', image.size, indices.tobytes())
+    frame.putpalette(PALETTE)
+    return frame
+
+
+def iter_frames(frames_dir):
+    """Yield palette frames from a directory or .frames store one at a time"""
+    if is_frame_store(frames_dir):
+        with FrameStore(frames_dir) as store:
+            for index in range(len(store)):
+                with stage('read'):
+                    frame = to_palette_frame(store.image(index))
+                yield frame
+        return
+
+    for path in list_frames(frames_dir):
+        with stage('read'):
+            with Image.open(path) as img:
+                frame = to_palette_frame(img)
+        yield frame
+
+
+def firmware_frame_ms(fps):
+    """Timer period the firmware actually uses: 1000 / ANIMATION_FPS in C"""
+    return 1000 // fps
+
+
+def frame_delays_cs(frame_ms):
+    """
+    Yield per-frame GIF delays in centiseconds averaging exactly frame_ms.
+
+    GIF delays are whole centiseconds, so the 33 ms firmware tick alternates
+    3 and 4 instead of drifting to 30 ms.
+    """
+    elapsed_cs = 0
+    frame_num = 0
+    while True:
+        frame_num += 1
+        target_cs = round(frame_num * frame_ms / 10)
+        yield target_cs - elapsed_cs
+        elapsed_cs = target_cs
+
+
+def gif_header(width, height, loop=0):
+    """Logical screen descriptor, 2-color global palette and loop extension"""
+    return (
+        b"GIF89a"
+        + width.to_bytes(2, 'little') + height.to_bytes(2, 'little')
+        + bytes([0x80, 0, 0])  # global color table of 2 entries, bg 0
+        + bytes(PALETTE)
+        + b"!\xff\x0bNETSCAPE2.0\x03\x01" + loop.to_bytes(2, 'little') + b"\x00"
+    )
+
+
+def write_streaming_gif(frames, output_path, size, frame_ms=firmware_frame_ms(30)):
+    """
+    Stream palette frames into a GIF file.
+
+    Identical consecutive frames are merged into one longer delay, so hold
+    frames cost nothing, and each written frame only encodes the rectangle
+    that changed since the previous one. Only the previous frame is kept
+    in memory.
+
+    Returns:
+        (frames read, frames written, duration in seconds)
+    """
+    delays = frame_delays_cs(frame_ms)
+    pending = None
+    pending_bytes = None
+    pending_delay = 0
+    previous = None  # last written frame as raw indices in an 'L' image
+    read = 0
+    written = 0
+    total_cs = 0
+
+    with open(output_path, 'wb') as f:
+        f.write(gif_header(*size))
+
+        def flush():
+            nonlocal previous
+            with stage('encode'):
+                current = Image.frombytes('L', size, pending_bytes)
+                bbox = None
+                if previous is not None:
+                    bbox = ImageChops.difference(previous, current).getbbox()
+                if bbox is None:
+                    bbox = (0, 0) + size
+                chunks = GifImagePlugin.getdata(pending.crop(bbox), offset=bbox[:2],
+                                                duration=pending_delay * 10)
+                previous = current
+            with stage('write'):
+                f.writelines(chunks)
+
+        for frame in frames:
+            read += 1
+            delay = next(delays)
+            total_cs += delay
+            data = frame.tobytes()
+            if pending is not None and data == pending_bytes:
+                pending_delay += delay
+                continue
+            if pending is not None:
+                flush()
+                written += 1
+            pending, pending_bytes, pending_delay = frame, data, delay
+
+        if pending is not None:
+            flush()
+            written += 1
+
+        f.write(b";")
+
+    return read, written, total_cs / 100
+
+
+def iter_contact_sheet(frame_dirs, labels):
+    """
+    Yield contact-sheet frames with every set side by side.
+
+    Sets shorter than the longest one hold their last frame.
+    """
+    count = len(frame_dirs)
+    width = count * FLIPPER_WIDTH + (count - 1) * SHEET_GAP
+    height = LABEL_HEIGHT + FLIPPER_HEIGHT
+
+    with stage('composite'):
+        base = Image.new('P', (width, height), 0)
+        base.putpalette(PALETTE)
+        draw = ImageDraw.Draw(base)
+        for i, label in enumerate(labels):
+            x = i * (FLIPPER_WIDTH + SHEET_GAP)
+            draw.text((x + 2, 1), label[:21], fill=1)
+
+    iterators = [iter_frames(d) for d in frame_dirs]
+    last = [None] * count
+
+    while True:
+        advanced = False
+        for i, frames in enumerate(iterators):
+            frame = next(frames, None)
+            if frame is not None:
+                last[i] = frame
+                advanced = True
+        if not advanced:
+            return
+
+        with stage('composite'):
+            sheet = base.copy()
+            for i, frame in enumerate(last):
+                if frame is not None:
+                    sheet.paste(frame, (i * (FLIPPER_WIDTH + SHEET_GAP), LABEL_HEIGHT))
+        yield sheet
+
+
+def find_frame_sets(root):
+    """Return 1-bit frame directories and .frames stores under root"""
+    return sorted(
+        os.path.join(root, d)
+        for d in os.listdir(root)
+        if ('1bit' in d and os.path.isdir(os.path.join(root, d)) and list_frames(os.path.join(root, d)))
+        or d.endswith(STORE_EXT)
+    )
+
+
+def label_for(frames_dir):
+    name = os.path.basename(os.path.normpath(frames_dir)).removesuffix(STORE_EXT)
+    name = name.replace('animation_frames', '').removeprefix('animation_')
+    return name.replace('_1bit', '').strip('_') or 'up'
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Stream 1-bit animation frames into GIF previews',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+Examples:
+  # Preview one set
+  uv run tools/build_preview.py images/animation_frames_down_1bit -o preview_animation_down.gif
+
+  # Contact sheet of every 1-bit set in images/
+  uv run tools/build_preview.py --all -o preview_sheet.gif
+
+  # Preview a packed frame store
+  uv run tools/build_preview.py images/animation_down.frames -o preview_animation_down.gif
+
+  # Contact sheet of chosen sets
+  uv run tools/build_preview.py images/animation_frames_1bit_top_to_center images/animation_frames_down_1bit -o sheet.gif
+        '''
+    )
+    parser.add_argument('frame_dirs', nargs='*', help='Frame directories (frame_*.png) or .frames stores')
+    parser.add_argument('-o', '--output', default=None,
+                       help='Output GIF (default: preview_animation.gif, or preview_sheet.gif for several sets)')
+    parser.add_argument('--all', action='store_true',
+                       help='Use every *1bit* frame directory and .frames store in images/')
+    parser.add_argument('--fps', type=int, default=30,
+                       help='Playback rate; frames last 1000 // FPS ms like the firmware timer (default: 30)')
+    add_profile_args(parser)
+
+    args = parser.parse_args()
+
+    frame_dirs = list(args.frame_dirs)
+    if args.all:
+        frame_dirs.extend(d for d in find_frame_sets('images') if d not in frame_dirs)
+    if not frame_dirs:
+        parser.error("give frame directories or --all")
+
+    output = args.output or ('preview_sheet.gif' if len(frame_dirs) > 1 else 'preview_animation.gif')
+
+    with profile_session('build_preview', args):
+        if len(frame_dirs) == 1:
+            frames = iter_frames(frame_dirs[0])
+            size = (FLIPPER_WIDTH, FLIPPER_HEIGHT)
+            print(f"Streaming {frame_dirs[0]} → {output}...")
+        else:
+            labels = [label_for(d) for d in frame_dirs]
+            frames = iter_contact_sheet(frame_dirs, labels)
+            size = (len(frame_dirs) * FLIPPER_WIDTH + (len(frame_dirs) - 1) * SHEET_GAP,
+                    LABEL_HEIGHT + FLIPPER_HEIGHT)
+            print(f"Streaming contact sheet of {len(frame_dirs)} sets → {output}...")
+            for d, label in zip(frame_dirs, labels):
+                print(f"  {label}: {d}")
+
+        read, written, duration = write_streaming_gif(frames, output, size, firmware_frame_ms(args.fps))
+
+    if not read:
+        print("❌ No frames found!")
+        sys.exit(1)
+
+    print(f"\n✓ Created {output}")
+    print(f"  {read} frames @ {firmware_frame_ms(args.fps)} ms ({written} written, {read - written} held)")
+    print(f"  Duration: {duration:.2f} seconds")
+    print(f"  Size: {os.path.getsize(output) / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,8 +11,12 @@ This is required for Flipper Zero's 1-bit display.
 """
 
 import os
+import sys
 from PIL import Image
 
+from frame_store import FrameStoreWriter, STORE_EXT
+from profiling import stage, session, pop_profile_args
+
 def floyd_steinberg_dither(image):
     """
     Apply Floyd-Steinberg dithering to convert grayscale to 1-bit.
@@ -56,10 +60,14 @@ def convert_frames_to_1bit(input_dir, output_dir):
 
     Args:
         input_dir: Directory containing color frames
-        output_dir: Directory to save 1-bit frames
+        output_dir: Directory to save 1-bit frames, or a .frames store to pack them into
     """
-    # Create output directory
-    os.makedirs(output_dir, exist_ok=True)
+    store = None
+    if output_dir.endswith(STORE_EXT):
+        store = FrameStoreWriter(output_dir)
+    else:
+        # Create output directory
+        os.makedirs(output_dir, exist_ok=True)
 
     # Get all frame files
     frame_files = sorted([
@@ -75,30 +83,46 @@ def convert_frames_to_1bit(input_dir, output_dir):
         output_path = os.path.join(output_dir, filename)
 
         # Load image
-        img = Image.open(input_path)
+        with stage('read'):
+            img = Image.open(input_path)
+            img.load()
 
         # Convert to 1-bit with dithering
-        img_1bit = floyd_steinberg_dither(img)
+        with stage('dither'):
+            img_1bit = floyd_steinberg_dither(img)
 
-        # Save as 1-bit PNG
-        img_1bit.save(output_path, 'PNG')
+        # Save as 1-bit PNG (or append to the store)
+        with stage('write'):
+            if store:
+                store.append(img_1bit)
+            else:
+                img_1bit.save(output_path, 'PNG')
 
         if i % 10 == 0:
             print(f"  Converted {i}/{len(frame_files)}")
 
+    if store:
+        store.close()
+        print(f"\n✓ Packed {len(frame_files)} frames into {output_dir}")
+        print(f"  Output: 1-bit frame store (export PNGs with tools/frame_store.py export)")
+        return
+
     print(f"\n✓ Converted {len(frame_files)} frames to {output_dir}/")
     print(f"  Output: 1-bit monochrome PNG (ready for Flipper Zero)")
 
 if __name__ == "__main__":
-    # Convert both animation sets
-    print("=== Converting UP animation (top sweep) ===")
-    convert_frames_to_1bit(
-        "images/animation_frames",
-        "images/animation_frames_1bit"
-    )
-
-    print("\n=== Converting DOWN animation (bottom sweep) ===")
-    convert_frames_to_1bit(
-        "images/animation_frames_down",
-        "images/animation_frames_down_1bit"
-    )
+    profile_path, cprofile_path = pop_profile_args(sys.argv)
+
+    with session('convert_to_1bit', profile_path, cprofile_path):
+        # Convert both animation sets
+        print("=== Converting UP animation (top sweep) ===")
+        convert_frames_to_1bit(
+            "images/animation_frames",
+            "images/animation_frames_1bit"
+        )
+
+        print("\n=== Converting DOWN animation (bottom sweep) ===")
+        convert_frames_to_1bit(
+            "images/animation_frames_down",
+            "images/animation_frames_down_1bit"
+        )
@@ -12,6 +12,8 @@ Create an animated GIF preview from animation frames.
 import os
 from PIL import Image
 
+from profiling import stage, session, pop_profile_args
+
 def create_animated_gif(frames_dir, output_path, fps=30):
     """
     Create animated GIF from frames.
@@ -31,7 +33,8 @@ def create_animated_gif(frames_dir, output_path, fps=30):
     print(f"Loading {len(frame_files)} frames...")
 
     # Load all frames
-    frames = [Image.open(f).convert("RGB") for f in frame_files]
+    with stage('read'):
+        frames = [Image.open(f).convert("RGB") for f in frame_files]
 
     # Calculate duration per frame in milliseconds
     duration_ms = int(1000 / fps)
@@ -39,14 +42,15 @@ def create_animated_gif(frames_dir, output_path, fps=30):
     print(f"Creating animated GIF at {fps} FPS ({duration_ms}ms per frame)...")
 
     # Save as animated GIF
-    frames[0].save(
-        output_path,
-        save_all=True,
-        append_images=frames[1:],
-        duration=duration_ms,
-        loop=0,  # Loop forever
-        optimize=True
-    )
+    with stage('encode'):
+        frames[0].save(
+            output_path,
+            save_all=True,
+            append_images=frames[1:],
+            duration=duration_ms,
+            loop=0,  # Loop forever
+            optimize=True
+        )
 
     total_duration = len(frames) * duration_ms / 1000
     print(f"\n✓ Created {output_path}")
@@ -57,6 +61,8 @@ def create_animated_gif(frames_dir, output_path, fps=30):
 if __name__ == "__main__":
     import sys
 
+    profile_path, cprofile_path = pop_profile_args(sys.argv)
+
     if len(sys.argv) > 1:
         frames_directory = sys.argv[1]
         output_file = sys.argv[2] if len(sys.argv) > 2 else "preview.gif"
@@ -64,4 +70,5 @@ if __name__ == "__main__":
         frames_directory = "images/animation_frames"
         output_file = "preview_animation.gif"
 
-    create_animated_gif(frames_directory, output_file, fps=30)
+    with session('create_preview_gif', profile_path, cprofile_path):
+        create_animated_gif(frames_directory, output_file, fps=30)
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# /// script
+# dependencies = [
+#   "pillow",
+# ]
+# ///
+
+"""
+Size each animation to the transmission it accompanies.
+
+Reads the signal arrays from signals/signals.h (or a build_playlist.py
+header, whose loop descriptors are expanded), computes how long each one
+takes to transmit, and derives how many animation timer ticks
+(1000 / ANIMATION_FPS ms each) that covers. The sweep for each signal is then
+laid out over exactly that many ticks; ticks that would show an identical
+image (no movement, or fully off screen) reuse an already stored bitmap,
+so only distinct frames are stored and a schedule maps every tick to one
+of them.
+
+Outputs a C header with the schedules and, optionally, the distinct frames
+as 1-bit PNGs ready for ufbt or as one packed .frames store per signal.
+"""
+
+import io
+import os
+import sys
+import math
+import argparse
+
+from PIL import Image
+
+from tx_emulator import parse_c_header, parse_loop_tables
+from frame_store import FrameStoreWriter, pack_frame, STORE_EXT
+from animation_render import ANIMATIONS, FLIPPER_WIDTH, FLIPPER_HEIGHT, frame_y, render_frame
+from preprocess import load_scaled, input_mtime_ns
+from profiling import stage, add_profile_args, profile_session
+
+DEFAULT_SIGNALS = "signals/signals.h"
+DEFAULT_SOURCE = "tools/preprocess.json"
+
+# Which animation plays with which signal (see casino_blinder.c key handling)
+DEFAULT_MAPPING = {
+    "signal_up_raw": "up",
+    "signal_down_raw": "down",
+}
+
+MIN_TICKS = 4  # through-animations need two frames per half
+
+
+def signal_duration_us(raw_data, loops=None):
+    """Transmit duration of an array, or of the playlist its loops describe"""
+    if loops is None:
+        return sum(abs(t) for t in raw_data)
+    return sum(
+        sum(abs(t) for t in raw_data[l['offset']:l['offset'] + l['count']]) * l['repeat']
+        + l['gap_us'] * (l['repeat'] - 1) + l['next_gap_us']
+        for l in loops)
+
+
+def tick_budget(duration_us, tick_ms):
+    """Number of timer ticks needed to cover a transmission"""
+    return max(MIN_TICKS, math.ceil(duration_us / (tick_ms * 1000)))
+
+
+def plan_animation(kind, ticks, scaled_height):
+    """
+    Lay out an animation over a number of ticks.
+
+    Returns:
+        (positions, schedule) where positions is the list of distinct Y
+        offsets (one stored frame each; None = image fully off screen) and
+        schedule maps every tick to an index into positions
+    """
+    positions = []
+    index_of = {}
+    schedule = []
+    for tick in range(ticks):
+        y = frame_y(kind, tick, ticks, scaled_height)
+        if y <= -scaled_height or y >= FLIPPER_HEIGHT:
+            y = None  # every off-screen position renders the same blank frame
+        if y not in index_of:
+            index_of[y] = len(positions)
+            positions.append(y)
+        schedule.append(index_of[y])
+    return positions, schedule
+
+
+def generate_schedule_header(plans, tick_ms):
+    """C header with one schedule array per signal"""
+    lines = [
+        "// Auto-generated by tools/frame_budget.py",
+        f"#define ANIMATION_TICK_MS {tick_ms}",
+        "",
+    ]
+    for plan in plans:
+        name = plan['signal']
+        lines.append(f"// {name}: {plan['duration_us']} us -> {len(plan['schedule'])} ticks, "
+                     f"{len(plan['positions'])} stored frames ({plan['kind']})")
+        ctype = "uint8_t" if len(plan['positions']) <= 256 else "uint16_t"
+        lines.append(f"static const {ctype} {name}_schedule[] = {{")
+        schedule = plan['schedule']
+        for i in range(0, len(schedule), 16):
+            lines.append("    " + ", ".join(f"{v:3d}" for v in schedule[i:i + 16]) + ",")
+        lines[-1] = lines[-1].rstrip(',')
+        lines.append("};")
+        lines.append(f"static const size_t {name}_schedule_count = {len(schedule)};")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def iter_distinct_frames(plan, source):
+    """Yield (index, PNG bytes) for a plan's distinct frames in index order"""
+    mtime_ns = input_mtime_ns(source)
+    ticks = len(plan['schedule'])
+    rendered = set()
+    for tick, index in enumerate(plan['schedule']):
+        # Indices are assigned in order of first use, so this is index order
+        if index in rendered:
+            continue
+        with stage('render'):
+            png = render_frame(source, mtime_ns, plan['kind'], ticks, tick)
+        rendered.add(index)
+        yield index, png
+
+
+def write_frames(plan, source, out_dir):
+    """
+    Write a plan's distinct frames as <signal>_NNN.png (icons I_<signal>_NNN).
+
+    Named after the signal, not the animation: two signals can share an
+    animation with different tick counts, and so different frames.
+    """
+    width = max(3, len(str(len(plan['positions']) - 1)))
+    for index, png in iter_distinct_frames(plan, source):
+        with stage('write'):
+            with open(os.path.join(out_dir, f"{plan['signal']}_{index:0{width}d}.png"), 'wb') as f:
+                f.write(png)
+
+
+def write_store(plan, source, out_dir):
+    """Pack a plan's distinct frames into <signal>.frames, indexed like the schedule"""
+    path = os.path.join(out_dir, f"{plan['signal']}{STORE_EXT}")
+    with FrameStoreWriter(path) as store:
+        for _, png in iter_distinct_frames(plan, source):
+            with stage('write'):
+                with Image.open(io.BytesIO(png)) as img:
+                    store.append(pack_frame(img))
+    return path
+
+
+def parse_mapping(items):
+    mapping = dict(DEFAULT_MAPPING)
+    for item in items:
+        name, _, kind = item.partition('=')
+        if kind not in ANIMATIONS:
+            raise ValueError(f"unknown animation '{kind}' (choose from {', '.join(ANIMATIONS)})")
+        mapping[name] = kind
+    return mapping
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Derive animation frame counts and schedules from signal durations',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+Examples:
+  # Show the budget for each signal in signals.h
+  uv run tools/frame_budget.py
+
+  # Write the schedule header and the distinct frames
+  uv run tools/frame_budget.py -o signals/animation_schedule.h --frames-dir images/animation_frames_budget
+
+  # Pack the distinct frames into one .frames store per signal
+  uv run tools/frame_budget.py -o signals/animation_schedule.h --store-dir images
+
+  # Pair a signal with a different animation
+  uv run tools/frame_budget.py --map signal_up_raw=bottom_through_top
+
+  # Budget for a playlist built with build_playlist.py --carray combo
+  uv run tools/frame_budget.py combo.h --map combo_raw=down
+        '''
+    )
+    parser.add_argument('signals', nargs='?', default=DEFAULT_SIGNALS,
+                       help=f'Generated signals header (default: {DEFAULT_SIGNALS})')
+    parser.add_argument('--source', default=DEFAULT_SOURCE,
+                       help=f'Source image or preprocess.py recipe (default: {DEFAULT_SOURCE})')
+    parser.add_argument('--fps', type=int, default=30,
+                       help='ANIMATION_FPS of the firmware; ticks are 1000 // FPS ms (default: 30)')
+    parser.add_argument('--map', action='append', default=[], metavar='SIGNAL=ANIMATION',
+                       help='Animation for a signal array (repeatable)')
+    parser.add_argument('-o', '--output', default=None,
+                       help='Write the schedule header here')
+    parser.add_argument('--frames-dir', default=None,
+                       help='Write the distinct frames here as 1-bit PNGs')
+    parser.add_argument('--store-dir', default=None,
+                       help='Write the distinct frames here as <signal>.frames stores')
+    add_profile_args(parser)
+
+    args = parser.parse_args()
+
+    try:
+        mapping = parse_mapping(args.map)
+    except ValueError as e:
+        parser.error(str(e))
+
+    tick_ms = 1000 // args.fps
+
+    with profile_session('frame_budget', args):
+        with stage('parse'):
+            arrays = parse_c_header(args.signals)
+            loop_tables = parse_loop_tables(args.signals)
+            scaled_height = load_scaled(args.source, FLIPPER_WIDTH).size[1]
+        if not arrays:
+            print(f"❌ No signal arrays found in {args.signals}!")
+            sys.exit(1)
+
+        print(f"📡 {args.signals} ({tick_ms} ms ticks)")
+        plans = []
+        for name, raw_data in arrays.items():
+            kind = mapping.get(name)
+            if kind is None:
+                print(f"   ⚠️  {name}: no animation mapped (use --map {name}=ANIMATION)")
+                continue
+
+            duration_us = signal_duration_us(raw_data, loop_tables.get(name))
+            ticks = tick_budget(duration_us, tick_ms)
+            positions, schedule = plan_animation(kind, ticks, scaled_height)
+            plans.append({'signal': name, 'kind': kind, 'duration_us': duration_us,
+                          'positions': positions, 'schedule': schedule})
+
+            print(f"   {name}: {duration_us / 1_000_000:.3f} s → {ticks} ticks "
+                  f"({ticks * tick_ms} ms), {len(positions)} stored frames "
+                  f"({ticks - len(positions)} holds), animation '{kind}'")
+
+        if args.output:
+            with open(args.output, 'w') as f:
+                f.write(generate_schedule_header(plans, tick_ms))
+            print(f"\n💾 Wrote {args.output}")
+
+        if args.frames_dir:
+            os.makedirs(args.frames_dir, exist_ok=True)
+            for plan in plans:
+                write_frames(plan, args.source, args.frames_dir)
+            total = sum(len(p['positions']) for p in plans)
+            print(f"💾 Wrote {total} frames to {args.frames_dir}/")
+
+        if args.store_dir:
+            os.makedirs(args.store_dir, exist_ok=True)
+            for plan in plans:
+                path = write_store(plan, args.source, args.store_dir)
+                print(f"💾 Packed {len(plan['positions'])} frames into {path}")
+
+
+if __name__ == '__main__':
+    main()
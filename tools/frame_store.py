@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+# /// script
+# dependencies = [
+#   "pillow",
+# ]
+# ///
+
+"""
+Packed, memory-mappable frame store for 1-bit animation sets.
+
+One .frames file holds a whole set: a 16-byte header followed by N frames of
+64 rows x 16 bytes. Frames are stored the way the Flipper draws XBM bitmaps
+(row-major, least significant bit first, 1 = black pixel), so a frame can be
+handed to canvas_draw_xbm() or emitted as a C array byte for byte.
+
+Opening a store maps the file instead of reading it, so any frame is an O(1)
+slice and a tool touching a few frames never pays for the rest. This replaces
+opening and decoding one PNG per frame; PNG directories can still be imported
+and exported for ufbt and for editing.
+"""
+
+import os
+import sys
+import mmap
+import struct
+import argparse
+
+from PIL import Image
+
+from profiling import stage, add_profile_args, profile_session
+
+FLIPPER_WIDTH = 128
+FLIPPER_HEIGHT = 64
+
+STORE_EXT = ".frames"
+MAGIC = b"FBFS"
+VERSION = 1
+# magic, version, header size, width, height, frame count
+HEADER = struct.Struct("<4sHHHHI")
+
+# Pillow raw mode for inverted (1 = black), LSB-first rows
+XBM_RAWMODE = "1;IR"
+
+
+def frame_size(width, height):
+    """Bytes per packed frame"""
+    return (width + 7) // 8 * height
+
+
+def pack_frame(image):
+    """Pack an image (any mode, thresholded at 128) into XBM bytes"""
+    if image.mode != "1":
+        image = image.convert("L").point(lambda v: 255 if v > 127 else 0).convert("1")
+    return image.tobytes("raw", XBM_RAWMODE)
+
+
+def unpack_frame(data, size):
+    """1-bit PIL image from packed XBM bytes"""
+    return Image.frombytes("1", size, bytes(data), "raw", XBM_RAWMODE)
+
+
+def is_frame_store(path):
+    return path.endswith(STORE_EXT) and os.path.isfile(path)
+
+
+class FrameStore:
+    """Read-only, memory-mapped view of a .frames file"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            raise ValueError(f"{path}: too short for a frame store header")
+        magic, version, header_size, width, height, count = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a frame store")
+        if version != VERSION:
+            raise ValueError(f"{path}: unsupported frame store version {version}")
+
+        self.width = width
+        self.height = height
+        self.size = (width, height)
+        self.count = count
+        self.frame_bytes = frame_size(width, height)
+        self._offset = header_size
+        if len(self._map) < header_size + count * self.frame_bytes:
+            raise ValueError(f"{path}: truncated ({count} frames in header)")
+        self._view = memoryview(self._map)
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # frames handed out are still alive; the map goes when they do
+
+    def frame(self, index):
+        """Packed bytes of one frame as a zero-copy memoryview"""
+        if not -self.count <= index < self.count:
+            raise IndexError(f"frame {index} out of range (0-{self.count - 1})")
+        start = self._offset + (index % self.count) * self.frame_bytes
+        return self._view[start:start + self.frame_bytes]
+
+    def image(self, index):
+        """One frame as a 1-bit PIL image"""
+        return unpack_frame(self.frame(index), self.size)
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self.frame(index)
+
+
+class FrameStoreWriter:
+    """Append frames to a new .frames file one at a time"""
+
+    def __init__(self, path, size=(FLIPPER_WIDTH, FLIPPER_HEIGHT)):
+        self.path = path
+        self.size = size
+        self.frame_bytes = frame_size(*size)
+        self.count = 0
+        self._file = open(path, "wb")
+        self._file.write(self._header())
+
+    def _header(self):
+        return HEADER.pack(MAGIC, VERSION, HEADER.size, self.size[0], self.size[1], self.count)
+
+    def append(self, frame):
+        """Add a frame given as a PIL image or packed bytes"""
+        data = frame if isinstance(frame, (bytes, bytearray, memoryview)) else pack_frame(frame)
+        if len(data) != self.frame_bytes:
+            raise ValueError(f"frame is {len(data)} bytes, expected {self.frame_bytes}")
+        self._file.write(data)
+        self.count += 1
+
+    def close(self):
+        self._file.seek(0)
+        self._file.write(self._header())
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def list_png_frames(frames_dir):
+    """Return sorted frame_*.png paths in a directory"""
+    return sorted(
+        os.path.join(frames_dir, f)
+        for f in os.listdir(frames_dir)
+        if f.startswith("frame_") and f.endswith(".png")
+    )
+
+
+def import_png_dir(frames_dir, path):
+    """Pack a directory of frame_*.png files into a store; return the frame count"""
+    files = list_png_frames(frames_dir)
+    if not files:
+        raise ValueError(f"{frames_dir}: no frame_*.png files")
+    with Image.open(files[0]) as first:
+        size = first.size
+    with FrameStoreWriter(path, size) as writer:
+        for png in files:
+            with stage("read"):
+                with Image.open(png) as img:
+                    data = pack_frame(img)
+            with stage("write"):
+                writer.append(data)
+    return len(files)
+
+
+def export_png_dir(path, frames_dir):
+    """
+    Write every frame of a store as frame_NNN.png; return the frame count.
+
+    Names are zero-padded to the widest index (at least 3 digits) so they
+    sort in frame order.
+    """
+    os.makedirs(frames_dir, exist_ok=True)
+    with FrameStore(path) as store:
+        width = max(3, len(str(len(store) - 1)))
+        for index in range(len(store)):
+            with stage("encode"):
+                img = store.image(index)
+            with stage("write"):
+                img.save(os.path.join(frames_dir, f"frame_{index:0{width}d}.png"), "PNG")
+        return len(store)
+
+
+def dedup_frames(store):
+    """
+    Map a store's frames to their distinct contents.
+
+    Returns:
+        (unique frame indices, schedule) where schedule[i] is the position in
+        the unique list of frame i
+    """
+    unique = []
+    index_of = {}
+    schedule = []
+    for index, data in enumerate(store):
+        key = bytes(data)
+        if key not in index_of:
+            index_of[key] = len(unique)
+            unique.append(index)
+        schedule.append(index_of[key])
+    return unique, schedule
+
+
+def generate_c_frames(name, store, dedup=False):
+    """C header with the frames as XBM arrays for canvas_draw_xbm()"""
+    indices = list(range(len(store)))
+    schedule = None
+    if dedup:
+        indices, schedule = dedup_frames(store)
+
+    lines = [
+        f"// Auto-generated by tools/frame_store.py from {os.path.basename(store.path)}",
+        f"// {len(indices)} frames, {store.width}x{store.height} XBM (LSB first, 1 = black)",
+        f"#define {name.upper()}_WIDTH {store.width}",
+        f"#define {name.upper()}_HEIGHT {store.height}",
+        "",
+        f"static const uint8_t {name}_frames[{len(indices)}][{store.frame_bytes}] = {{",
+    ]
+    for index in indices:
+        data = store.frame(index)
+        lines.append("    {")
+        for i in range(0, len(data), 16):
+            lines.append("        " + ", ".join(f"0x{b:02x}" for b in data[i:i + 16]) + ",")
+        lines[-1] = lines[-1].rstrip(",")
+        lines.append("    },")
+    lines[-1] = lines[-1].rstrip(",")
+    lines.append("};")
+    lines.append(f"static const size_t {name}_frame_count = {len(indices)};")
+
+    if schedule is not None:
+        ctype = "uint8_t" if len(indices) <= 256 else "uint16_t"
+        lines.append("")
+        lines.append(f"// Frame shown at each step, indexing {name}_frames")
+        lines.append(f"static const {ctype} {name}_schedule[] = {{")
+        for i in range(0, len(schedule), 16):
+            lines.append("    " + ", ".join(f"{v:3d}" for v in schedule[i:i + 16]) + ",")
+        lines[-1] = lines[-1].rstrip(",")
+        lines.append("};")
+        lines.append(f"static const size_t {name}_schedule_count = {len(schedule)};")
+
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pack, inspect and export memory-mapped 1-bit frame stores",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Pack a PNG frame directory
+  uv run tools/frame_store.py import images/animation_frames_down_1bit -o images/animation_down.frames
+
+  # Show size and duplicate frames
+  uv run tools/frame_store.py info images/animation_down.frames
+
+  # Back to PNGs (e.g. for ufbt icons)
+  uv run tools/frame_store.py export images/animation_down.frames images/animation_frames_down_1bit
+
+  # C header for canvas_draw_xbm(), storing identical frames once
+  uv run tools/frame_store.py carray images/animation_down.frames --name anim_down --dedup -o anim_down.h
+        """
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("import", help="Pack a frame_*.png directory into a store")
+    p.add_argument("frames_dir", help="Directory with frame_*.png files")
+    p.add_argument("-o", "--output", default=None,
+                   help=f"Store file (default: <frames_dir>{STORE_EXT})")
+    add_profile_args(p)
+
+    p = commands.add_parser("export", help="Write a store's frames as frame_NNN.png")
+    p.add_argument("store", help=f"{STORE_EXT} file")
+    p.add_argument("frames_dir", help="Output directory")
+    add_profile_args(p)
+
+    p = commands.add_parser("info", help="Show frame count, size and duplicates")
+    p.add_argument("store", help=f"{STORE_EXT} file")
+    add_profile_args(p)
+
+    p = commands.add_parser("carray", help="Emit a C header with XBM frame arrays")
+    p.add_argument("store", help=f"{STORE_EXT} file")
+    p.add_argument("--name", default=None, help="Array name prefix (default: from file name)")
+    p.add_argument("--dedup", action="store_true",
+                   help="Store identical frames once and add a schedule array")
+    p.add_argument("-o", "--output", default=None, help="Output .h file (default: stdout)")
+    add_profile_args(p)
+
+    args = parser.parse_args()
+
+    with profile_session("frame_store", args):
+        try:
+            if args.command == "import":
+                output = args.output or os.path.normpath(args.frames_dir) + STORE_EXT
+                count = import_png_dir(args.frames_dir, output)
+                print(f"💾 Packed {count} frames → {output} ({os.path.getsize(output):,} bytes)")
+
+            elif args.command == "export":
+                count = export_png_dir(args.store, args.frames_dir)
+                print(f"💾 Wrote {count} frames to {args.frames_dir}/")
+
+            elif args.command == "info":
+                with FrameStore(args.store) as store:
+                    unique, _ = dedup_frames(store)
+                    print(f"🎞️  {args.store}")
+                    print(f"   {len(store)} frames, {store.width}x{store.height}, "
+                          f"{store.frame_bytes} bytes each")
+                    print(f"   {len(unique)} distinct ({len(store) - len(unique)} duplicates)")
+
+            elif args.command == "carray":
+                stem = os.path.splitext(os.path.basename(args.store))[0]
+                name = args.name or "".join(c if c.isalnum() else "_" for c in stem.lower())
+                with FrameStore(args.store) as store:
+                    with stage("encode"):
+                        header = generate_c_frames(name, store, args.dedup)
+                if args.output:
+                    with open(args.output, "w") as f:
+                        f.write(header)
+                    print(f"💾 Wrote {args.output} ({name}_frames)")
+                else:
+                    sys.stdout.write(header)
+
+        except (OSError, ValueError) as e:
+            print(f"❌ {e}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,34 +12,30 @@ Output frames are sized for Flipper Zero (128x64).
 """
 
 import os
+import sys
 from PIL import Image
 
+from preprocess import load_scaled
+from profiling import stage, session, pop_profile_args
+
 def generate_sweep_animation_down(input_path, output_dir, num_frames=100):
     """
     Generate sweep animation frames (bottom to center).
 
     Args:
-        input_path: Path to source casino.png
+        input_path: Path to source casino.png or a preprocess.py recipe
         output_dir: Directory to save frames
         num_frames: Number of frames to generate (default 100)
     """
-    # Load source image
-    source = Image.open(input_path).convert("RGBA")
-    src_width, src_height = source.size
-
-    print(f"Source image: {src_width}x{src_height} ({source.mode})")
+    print(f"Source image: {input_path}")
 
     # Flipper Zero display dimensions
     FLIPPER_WIDTH = 128
     FLIPPER_HEIGHT = 64
 
-    # Calculate scaling to fit width
-    scale_factor = FLIPPER_WIDTH / src_width
-    scaled_height = int(src_height * scale_factor)
-    scaled_width = FLIPPER_WIDTH
-
-    # Resize source image to fit Flipper width
-    scaled_source = source.resize((scaled_width, scaled_height), Image.Resampling.LANCZOS)
+    # Source scaled to fit Flipper width (cached by preprocess.py)
+    scaled_source = load_scaled(input_path, FLIPPER_WIDTH)
+    scaled_width, scaled_height = scaled_source.size
     print(f"Scaled image: {scaled_width}x{scaled_height}")
 
     # Create output directory
@@ -64,11 +60,13 @@ def generate_sweep_animation_down(input_path, output_dir, num_frames=100):
         current_y = int(start_y + (end_y - start_y) * progress)
 
         # Paste the scaled image at current position
-        frame.paste(scaled_source, (0, current_y), scaled_source)
+        with stage('composite'):
+            frame.paste(scaled_source, (0, current_y), scaled_source)
 
         # Save frame
         output_path = os.path.join(output_dir, f"frame_{frame_num:03d}.png")
-        frame.save(output_path, "PNG")
+        with stage('write'):
+            frame.save(output_path, "PNG")
 
         if frame_num % 10 == 0:
             print(f"Generated frame {frame_num}/{num_frames-1}")
@@ -78,7 +76,9 @@ def generate_sweep_animation_down(input_path, output_dir, num_frames=100):
     print(f"  Image sweep: from Y={start_y} to Y={end_y}")
 
 if __name__ == "__main__":
-    input_image = "images/casino.png"
+    input_image = "tools/preprocess.json"  # recipe for images/casino.png
     output_directory = "images/animation_frames_down"
 
-    generate_sweep_animation_down(input_image, output_directory, num_frames=100)
+    profile_path, cprofile_path = pop_profile_args(sys.argv)
+    with session('generate_sweep_animation_down', profile_path, cprofile_path):
+        generate_sweep_animation_down(input_image, output_directory, num_frames=100)
@@ -12,8 +12,12 @@ Generate "through" animations where the image passes completely through the scre
 """
 
 import os
+import sys
 from PIL import Image
 
+from preprocess import load_scaled
+from profiling import stage, session, pop_profile_args
+
 def floyd_steinberg_dither(image):
     """Apply Floyd-Steinberg dithering to convert grayscale to 1-bit."""
     img = image.convert('L')
@@ -46,15 +50,12 @@ def generate_bottom_through_top(input_path, output_dir, num_frames=100):
     Frame 0-49: Enter from bottom to center
     Frame 50-99: Exit from center through top
     """
-    source = Image.open(input_path).convert("RGBA")
-    src_width, src_height = source.size
-
     FLIPPER_WIDTH = 128
     FLIPPER_HEIGHT = 64
 
-    scale_factor = FLIPPER_WIDTH / src_width
-    scaled_height = int(src_height * scale_factor)
-    scaled_source = source.resize((FLIPPER_WIDTH, scaled_height), Image.Resampling.LANCZOS)
+    # Source scaled to fit Flipper width (cached by preprocess.py)
+    scaled_source = load_scaled(input_path, FLIPPER_WIDTH)
+    scaled_height = scaled_source.size[1]
 
     os.makedirs(output_dir, exist_ok=True)
 
@@ -74,12 +75,15 @@ def generate_bottom_through_top(input_path, output_dir, num_frames=100):
             end_y = -scaled_height
             current_y = int(center_y + (end_y - center_y) * progress)
 
-        frame.paste(scaled_source, (0, current_y), scaled_source)
+        with stage('composite'):
+            frame.paste(scaled_source, (0, current_y), scaled_source)
 
         # Convert to 1-bit
-        frame_1bit = floyd_steinberg_dither(frame)
+        with stage('dither'):
+            frame_1bit = floyd_steinberg_dither(frame)
         output_path = os.path.join(output_dir, f"frame_{frame_num:03d}.png")
-        frame_1bit.save(output_path, "PNG")
+        with stage('write'):
+            frame_1bit.save(output_path, "PNG")
 
         if frame_num % 10 == 0:
             print(f"  Frame {frame_num}/{num_frames-1}")
@@ -93,15 +97,12 @@ def generate_top_through_bottom(input_path, output_dir, num_frames=100):
     Frame 0-49: Enter from top to center
     Frame 50-99: Exit from center through bottom
     """
-    source = Image.open(input_path).convert("RGBA")
-    src_width, src_height = source.size
-
     FLIPPER_WIDTH = 128
     FLIPPER_HEIGHT = 64
 
-    scale_factor = FLIPPER_WIDTH / src_width
-    scaled_height = int(src_height * scale_factor)
-    scaled_source = source.resize((FLIPPER_WIDTH, scaled_height), Image.Resampling.LANCZOS)
+    # Source scaled to fit Flipper width (cached by preprocess.py)
+    scaled_source = load_scaled(input_path, FLIPPER_WIDTH)
+    scaled_height = scaled_source.size[1]
 
     os.makedirs(output_dir, exist_ok=True)
 
@@ -121,12 +122,15 @@ def generate_top_through_bottom(input_path, output_dir, num_frames=100):
             end_y = FLIPPER_HEIGHT
             current_y = int(center_y + (end_y - center_y) * progress)
 
-        frame.paste(scaled_source, (0, current_y), scaled_source)
+        with stage('composite'):
+            frame.paste(scaled_source, (0, current_y), scaled_source)
 
         # Convert to 1-bit
-        frame_1bit = floyd_steinberg_dither(frame)
+        with stage('dither'):
+            frame_1bit = floyd_steinberg_dither(frame)
         output_path = os.path.join(output_dir, f"frame_{frame_num:03d}.png")
-        frame_1bit.save(output_path, "PNG")
+        with stage('write'):
+            frame_1bit.save(output_path, "PNG")
 
         if frame_num % 10 == 0:
             print(f"  Frame {frame_num}/{num_frames-1}")
@@ -134,16 +138,18 @@ def generate_top_through_bottom(input_path, output_dir, num_frames=100):
     print(f"✓ Generated {num_frames} frames in {output_dir}/")
 
 if __name__ == "__main__":
-    input_image = "images/casino.png"
-
-    print("=== Generating BOTTOM → THROUGH TOP animation ===")
-    generate_bottom_through_top(
-        input_image,
-        "images/animation_frames_1bit_bottom_through_top"
-    )
-
-    print("\n=== Generating TOP → THROUGH BOTTOM animation ===")
-    generate_top_through_bottom(
-        input_image,
-        "images/animation_frames_1bit_top_through_bottom"
-    )
+    input_image = "tools/preprocess.json"  # recipe for images/casino.png
+    profile_path, cprofile_path = pop_profile_args(sys.argv)
+
+    with session('generate_through_animations', profile_path, cprofile_path):
+        print("=== Generating BOTTOM → THROUGH TOP animation ===")
+        generate_bottom_through_top(
+            input_image,
+            "images/animation_frames_1bit_bottom_through_top"
+        )
+
+        print("\n=== Generating TOP → THROUGH BOTTOM animation ===")
+        generate_top_through_bottom(
+            input_image,
+            "images/animation_frames_1bit_top_through_bottom"
+        )
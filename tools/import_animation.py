@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# /// script
+# dependencies = [
+#   "pillow",
+# ]
+# ///
+
+"""
+Import an animated GIF or numbered image sequence as Flipper frames.
+
+Source frames are resampled onto the firmware's animation timer (one output
+frame per 1000 / ANIMATION_FPS ms tick, so a 25 FPS clip plays at its real
+speed on the 33 ms timer), fitted to 128x64 on a white background and
+Floyd-Steinberg dithered - by Pillow's C implementation by default, or with
+--dither exact by convert_to_1bit.py's integer version (~35 ms per frame in
+pure Python).
+
+Work is split into chunks for a process pool. Image sequences are decoded
+in the workers; an animated GIF can only be decoded front to back (every
+seek replays the earlier frames), so it is read once in this process and
+each frame is shrunk to display size immediately, leaving fit and dither to
+the workers. Either way only one full-resolution frame per process and a
+bounded number of chunks are alive at a time, and results are written in
+order as they arrive - to a frame_*.png directory or a .frames store.
+"""
+
+import os
+import re
+import sys
+import glob
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageOps
+
+from convert_to_1bit import floyd_steinberg_dither
+from frame_store import FrameStoreWriter, pack_frame, unpack_frame, STORE_EXT
+from profiling import stage, add_profile_args, profile_session
+
+FLIPPER_WIDTH = 128
+FLIPPER_HEIGHT = 64
+
+IMAGE_EXTS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp', '.tif', '.tiff')
+FIT_MODES = ('contain', 'cover', 'width')
+DITHER_MODES = ('pillow', 'exact')
+DEFAULT_CHUNK = 16  # source frames per worker task
+GIF_DEFAULT_DURATION_MS = 100  # what browsers show for 0 / missing delays
+
+
+def natural_key(path):
+    """Sort key that orders frame2 before frame10"""
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', path)]
+
+
+def list_sequence(source):
+    """Image files of a numbered sequence given as a directory or glob"""
+    if os.path.isdir(source):
+        files = [os.path.join(source, f) for f in os.listdir(source)
+                 if f.lower().endswith(IMAGE_EXTS)]
+    else:
+        files = glob.glob(source)
+    return sorted(files, key=natural_key)
+
+
+def ticks_covered(start_us, duration_us, tick_us):
+    """Output ticks whose start falls inside [start_us, start_us + duration_us)"""
+    first = -(-start_us // tick_us)
+    end = -(-(start_us + duration_us) // tick_us)
+    return end - first
+
+
+def flatten(image):
+    """Any mode → grayscale 'L' on white, as the generators composite onto white"""
+    if image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info:
+        image = image.convert('RGBA')
+        background = Image.new('RGBA', image.size, (255, 255, 255, 255))
+        image = Image.alpha_composite(background, image)
+    return image.convert('L')
+
+
+def fit_frame(image, fit):
+    """Fit a grayscale frame onto the 128x64 display"""
+    size = (FLIPPER_WIDTH, FLIPPER_HEIGHT)
+    if fit == 'cover':
+        return ImageOps.fit(image, size, Image.Resampling.LANCZOS)
+
+    if fit == 'width':
+        # Like the sweep generators: full width, vertically centered
+        height = max(1, round(image.size[1] * FLIPPER_WIDTH / image.size[0]))
+        scaled = image.resize((FLIPPER_WIDTH, height), Image.Resampling.LANCZOS)
+    else:
+        scaled = ImageOps.contain(image, size, Image.Resampling.LANCZOS)
+
+    frame = Image.new('L', size, 255)
+    frame.paste(scaled, ((FLIPPER_WIDTH - scaled.size[0]) // 2,
+                         (FLIPPER_HEIGHT - scaled.size[1]) // 2))
+    return frame
+
+
+def prefit_size(image_size, fit):
+    """
+    Smallest size a decoded GIF frame can be shrunk to before fit_frame.
+
+    Keeps 2x the display resolution so the LANCZOS resize in the worker
+    still has detail to work with.
+    """
+    width, height = image_size
+    scale = max(2 * FLIPPER_WIDTH / width, 2 * FLIPPER_HEIGHT / height)
+    if fit == 'contain':
+        scale = min(2 * FLIPPER_WIDTH / width, 2 * FLIPPER_HEIGHT / height)
+    elif fit == 'width':
+        scale = 2 * FLIPPER_WIDTH / width
+    if scale >= 1:
+        return image_size
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def dither_frame(frame, dither):
+    """Floyd-Steinberg dither a fitted frame to 1-bit"""
+    if dither == 'exact':
+        return floyd_steinberg_dither(frame)
+    return frame.convert('1', dither=Image.Dither.FLOYDSTEINBERG)
+
+
+def process_chunk(items, fit, dither):
+    """
+    Decode (if needed), fit and dither one chunk in a worker.
+
+    items are file paths or (size, grayscale bytes) of pre-shrunk frames.
+    Returns the packed 1-bit frames in order.
+    """
+    packed = []
+    for item in items:
+        with stage('read'):
+            if isinstance(item, str):
+                with Image.open(item) as img:
+                    gray = flatten(img)
+            else:
+                size, data = item
+                gray = Image.frombytes('L', size, data)
+        with stage('resize'):
+            frame = fit_frame(gray, fit)
+        with stage('dither'):
+            packed.append(pack_frame(dither_frame(frame, dither)))
+    return packed
+
+
+def iter_gif_items(path, tick_us, src_fps, fit):
+    """Yield (pre-shrunk frame, ticks) for each displayed frame of an animated image"""
+    start_us = 0
+    with Image.open(path) as img:
+        for index in range(getattr(img, 'n_frames', 1)):
+            with stage('read'):
+                img.seek(index)
+                if src_fps:
+                    duration_us = round(1_000_000 / src_fps)
+                else:
+                    duration_us = (img.info.get('duration') or GIF_DEFAULT_DURATION_MS) * 1000
+                ticks = ticks_covered(start_us, duration_us, tick_us)
+                start_us += duration_us
+                if not ticks:
+                    continue  # shown for less than a tick; keep decoding only
+                gray = flatten(img)
+            with stage('resize'):
+                size = prefit_size(gray.size, fit)
+                if size != gray.size:
+                    gray = gray.resize(size, Image.Resampling.BOX)
+            yield (gray.size, gray.tobytes()), ticks
+
+
+def iter_sequence_items(files, tick_us, src_fps):
+    """Yield (path, ticks) for each frame of a sequence played at src_fps"""
+    start_us = 0
+    for path in files:
+        duration_us = round(1_000_000 / src_fps)
+        ticks = ticks_covered(start_us, duration_us, tick_us)
+        start_us += duration_us
+        if ticks:
+            yield path, ticks
+
+
+def iter_chunks(items, chunk_size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def import_frames(items, fit, dither, jobs, chunk_size=DEFAULT_CHUNK):
+    """
+    Yield (packed frame, ticks) in source order.
+
+    At most 2 * jobs chunks are queued at once, so a long clip never has
+    all of its frames in memory.
+    """
+    chunks = iter_chunks(items, chunk_size)
+    if jobs == 1:
+        for chunk in chunks:
+            frames = process_chunk([item for item, _ in chunk], fit, dither)
+            yield from zip(frames, (ticks for _, ticks in chunk))
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((pool.submit(process_chunk, [item for item, _ in chunk], fit, dither),
+                            [ticks for _, ticks in chunk]))
+            if len(pending) >= 2 * jobs:
+                future, ticks = pending.popleft()
+                yield from zip(future.result(), ticks)
+        while pending:
+            future, ticks = pending.popleft()
+            yield from zip(future.result(), ticks)
+
+
+class FrameDirWriter:
+    """
+    Write packed frames as frame_NNN.png, like the generators.
+
+    The frame count is only known at the end, so past 1000 frames the names
+    are widened on close (frame_0000.png ...) to keep them in sort order.
+    """
+
+    def __init__(self, frames_dir):
+        os.makedirs(frames_dir, exist_ok=True)
+        self.frames_dir = frames_dir
+        self.count = 0
+
+    def append(self, data):
+        unpack_frame(data, (FLIPPER_WIDTH, FLIPPER_HEIGHT)).save(
+            self.frame_path(self.count, 3), 'PNG')
+        self.count += 1
+
+    def frame_path(self, index, width):
+        return os.path.join(self.frames_dir, f"frame_{index:0{width}d}.png")
+
+    def close(self):
+        width = len(str(self.count - 1))
+        if width > 3:
+            for index in range(self.count):
+                os.replace(self.frame_path(index, 3), self.frame_path(index, width))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Import an animated GIF or image sequence as 1-bit Flipper frames',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+Examples:
+  # Animated GIF → PNG frame directory at the firmware's 30 FPS
+  uv run tools/import_animation.py clip.gif -o images/animation_frames_clip_1bit
+
+  # Straight into a frame store, cropping to fill the screen
+  uv run tools/import_animation.py clip.gif -o images/clip.frames --fit cover
+
+  # Numbered PNG sequence rendered at 24 FPS
+  uv run tools/import_animation.py 'render/frame_*.png' --src-fps 24 -o images/render.frames
+        '''
+    )
+    parser.add_argument('source', help='Animated GIF/WebP/APNG, or a directory or glob of numbered images')
+    parser.add_argument('-o', '--output', required=True,
+                       help=f'Output frame directory, or a {STORE_EXT} store')
+    parser.add_argument('--fps', type=int, default=30,
+                       help='ANIMATION_FPS of the firmware; frames are 1000 // FPS ms (default: 30)')
+    parser.add_argument('--src-fps', type=float, default=None,
+                       help='Source frame rate (default: GIF frame delays, or 30 for sequences)')
+    parser.add_argument('--fit', choices=FIT_MODES, default='contain',
+                       help='contain: letterbox, cover: crop to fill, width: full width like the sweep generators (default: contain)')
+    parser.add_argument('--dither', choices=DITHER_MODES, default='pillow',
+                       help="pillow: fast C Floyd-Steinberg, exact: convert_to_1bit.py's (slow) (default: pillow)")
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                       help='Parallel worker processes (default: CPU count)')
+    parser.add_argument('--chunk', type=int, default=DEFAULT_CHUNK,
+                       help=f'Source frames per worker task (default: {DEFAULT_CHUNK})')
+    add_profile_args(parser)
+
+    args = parser.parse_args()
+
+    tick_us = (1000 // args.fps) * 1000
+    jobs = max(1, args.jobs or 1)
+    if args.profile or args.cprofile:
+        # Stages run in workers are invisible to the profiler
+        jobs = 1
+
+    if os.path.isfile(args.source) and not glob.has_magic(args.source):
+        items = iter_gif_items(args.source, tick_us, args.src_fps, args.fit)
+        kind = 'animation'
+    else:
+        files = list_sequence(args.source)
+        if not files:
+            print(f"❌ No images found for {args.source}")
+            sys.exit(1)
+        items = iter_sequence_items(files, tick_us, args.src_fps or 30)
+        kind = f'sequence of {len(files)} images'
+
+    if args.output.endswith(STORE_EXT):
+        writer = FrameStoreWriter(args.output)
+    else:
+        writer = FrameDirWriter(args.output)
+
+    print(f"🎞️  Importing {args.source} ({kind}) → {args.output}")
+    print(f"   {tick_us // 1000} ms ticks, fit: {args.fit}, dither: {args.dither}, {jobs} worker(s)")
+
+    used = 0
+    with profile_session('import_animation', args), writer:
+        try:
+            for data, ticks in import_frames(items, args.fit, args.dither, jobs, args.chunk):
+                used += 1
+                with stage('write'):
+                    for _ in range(ticks):
+                        writer.append(data)
+        except (OSError, ValueError) as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+
+    if not writer.count:
+        print("❌ No frames imported!")
+        sys.exit(1)
+
+    print(f"\n✓ {writer.count} frames ({writer.count * tick_us / 1_000_000:.2f} s) "
+          f"from {used} source frames")
+
+
+if __name__ == '__main__':
+    main()
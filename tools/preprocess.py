@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# /// script
+# dependencies = [
+#   "pillow",
+# ]
+# ///
+
+"""
+Reproducible, cached source preprocessing for the animation generators.
+
+A recipe (tools/preprocess.json) describes how the source image is made:
+
+    {
+      "source": "images/casino.png",  # any Pillow-readable image
+      "crop": null,                   # null, [left, top, right, bottom] or "alpha"
+      "contrast": 1.0,                # ImageEnhance.Contrast factor
+      "gamma": 1.0,                   # < 1 brightens, > 1 darkens
+      "grayscale": false,             # threshold-ready gray, alpha kept
+      "widths": [256, 128]            # pyramid levels to keep
+    }
+
+The processed full-resolution image and a pyramid of pre-scaled variants
+are cached under .cache/preprocess/<key>/, where the key hashes the source
+file's bytes together with the recipe, so editing the source or any step
+invalidates exactly what it affects. Generators ask for a width with
+load_scaled(); pyramid widths are resized from full resolution once
+(LANCZOS, as the generators always did), and any other width is resized
+from the smallest cached level at least twice its size. Changing animation
+parameters therefore never touches the full-resolution image again.
+
+Anywhere a source image path is accepted, a recipe .json path can be given
+instead; a plain image is treated as a recipe with every step disabled, so
+its variants match the generators' old direct resize exactly.
+"""
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import argparse
+import tempfile
+import threading
+from functools import lru_cache
+
+from PIL import Image, ImageEnhance
+
+from profiling import stage, add_profile_args, profile_session
+
+CACHE_DIR = ".cache/preprocess"
+DEFAULT_RECIPE = "tools/preprocess.json"
+DEFAULT_WIDTHS = [256, 128]
+
+# Serializes cache misses within a process (the preview server's threads
+# all ask for the same variant on first load)
+_miss_lock = threading.RLock()
+
+RECIPE_DEFAULTS = {
+    "crop": None,
+    "contrast": 1.0,
+    "gamma": 1.0,
+    "grayscale": False,
+    "widths": DEFAULT_WIDTHS,
+}
+
+
+def load_recipe(path):
+    """Recipe dict for a .json recipe or a plain image path"""
+    if path.endswith(".json"):
+        with open(path, "r") as f:
+            recipe = dict(RECIPE_DEFAULTS, **json.load(f))
+        if "source" not in recipe:
+            raise ValueError(f"{path}: recipe has no 'source'")
+    else:
+        recipe = dict(RECIPE_DEFAULTS, source=path)
+    if recipe["crop"] not in (None, "alpha") and len(recipe["crop"]) != 4:
+        raise ValueError("crop must be null, 'alpha' or [left, top, right, bottom]")
+    return recipe
+
+
+def is_identity(recipe):
+    """True when the recipe leaves the source image unchanged"""
+    return (recipe["crop"] is None and recipe["contrast"] == 1.0
+            and recipe["gamma"] == 1.0 and not recipe["grayscale"])
+
+
+@lru_cache(maxsize=32)
+def _file_hash(path, mtime_ns, size):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_hash(path):
+    """SHA-256 of a file, memoized per (path, mtime, size)"""
+    st = os.stat(path)
+    return _file_hash(path, st.st_mtime_ns, st.st_size)
+
+
+def cache_key(recipe):
+    """Key over the source bytes and every step that changes the pixels"""
+    steps = {k: recipe[k] for k in ("crop", "contrast", "gamma", "grayscale")}
+    digest = hashlib.sha256(file_hash(recipe["source"]).encode())
+    digest.update(json.dumps(steps, sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+def input_mtime_ns(path):
+    """Latest mtime of a source image, or of a recipe and the image it names"""
+    mtimes = [os.stat(path).st_mtime_ns]
+    if path.endswith(".json"):
+        mtimes.append(os.stat(load_recipe(path)["source"]).st_mtime_ns)
+    return max(mtimes)
+
+
+def apply_recipe(recipe):
+    """Run the full-resolution steps: crop → contrast → gamma → grayscale"""
+    image = Image.open(recipe["source"]).convert("RGBA")
+
+    crop = recipe["crop"]
+    if crop == "alpha":
+        bbox = image.getchannel("A").getbbox()
+        if bbox:
+            image = image.crop(bbox)
+    elif crop is not None:
+        image = image.crop(tuple(crop))
+
+    alpha = image.getchannel("A")
+    rgb = image.convert("RGB")
+    if recipe["contrast"] != 1.0:
+        rgb = ImageEnhance.Contrast(rgb).enhance(recipe["contrast"])
+    if recipe["gamma"] != 1.0:
+        gamma = recipe["gamma"]
+        rgb = rgb.point([round(255 * (v / 255) ** gamma) for v in range(256)] * 3)
+    if recipe["grayscale"]:
+        rgb = rgb.convert("L").convert("RGB")
+
+    image = rgb.convert("RGBA")
+    image.putalpha(alpha)
+    return image
+
+
+class SourceCache:
+    """Cached full-resolution result and pyramid for one recipe"""
+
+    def __init__(self, recipe, cache_dir=CACHE_DIR):
+        self.recipe = recipe
+        self.key = cache_key(recipe)
+        self.dir = os.path.join(cache_dir, self.key)
+
+    def level_path(self, width):
+        return os.path.join(self.dir, f"w{width}.png")
+
+    def cached_widths(self):
+        if not os.path.isdir(self.dir):
+            return []
+        return sorted(int(f[1:-4]) for f in os.listdir(self.dir)
+                      if f.startswith("w") and f.endswith(".png"))
+
+    def _save(self, image, path):
+        os.makedirs(self.dir, exist_ok=True)
+        # Unique temp name: other processes may be filling the same entry
+        fd, tmp = tempfile.mkstemp(dir=self.dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                image.save(f, "PNG")
+            os.replace(tmp, path)  # readers never see a partial file
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def full_path(self):
+        if is_identity(self.recipe):
+            return self.recipe["source"]
+        return os.path.join(self.dir, "full.png")
+
+    def full_size(self):
+        """Size of the processed image (header read only, once it is cached)"""
+        if not os.path.exists(self.full_path()):
+            return self.full().size
+        with Image.open(self.full_path()) as img:
+            return img.size
+
+    def full(self):
+        """The processed full-resolution image"""
+        path = self.full_path()
+        with _miss_lock:
+            if os.path.exists(path):
+                with stage("read"):
+                    return Image.open(path).convert("RGBA")
+            with stage("preprocess"):
+                image = apply_recipe(self.recipe)
+            with stage("write"):
+                self._save(image, path)
+            return image
+
+    def scaled(self, width):
+        """Variant scaled to width, from the cache or the best larger level"""
+        path = self.level_path(width)
+        if os.path.exists(path):
+            return self._read_level(path)
+
+        with _miss_lock:
+            if os.path.exists(path):
+                return self._read_level(path)  # another thread just made it
+
+            # Pyramid levels come from full resolution; other widths from the
+            # smallest cached level with at least 2x the detail
+            larger = [w for w in self.cached_widths() if w >= 2 * width]
+            if width in self.recipe["widths"] or not larger:
+                base = self.full()
+            else:
+                with stage("read"):
+                    base = Image.open(self.level_path(larger[0])).convert("RGBA")
+
+            # Height from the full-resolution size, as the generators computed it
+            full_width, full_height = self.full_size()
+            height = int(full_height * (width / full_width))
+            with stage("resize"):
+                image = base.resize((width, height), Image.Resampling.LANCZOS)
+            with stage("write"):
+                self._save(image, path)
+            return image
+
+    def _read_level(self, path):
+        with stage("read"):
+            image = Image.open(path)
+            image.load()
+        return image
+
+    def build(self):
+        """Make sure every pyramid level is cached; return their paths"""
+        for width in sorted(self.recipe["widths"], reverse=True):
+            self.scaled(width)
+        return [self.level_path(w) for w in sorted(self.recipe["widths"], reverse=True)]
+
+
+def load_scaled(path, width):
+    """
+    RGBA source scaled to width, for a source image or a recipe .json.
+
+    The drop-in replacement for Image.open(path).convert("RGBA").resize(...)
+    in the generators.
+    """
+    return SourceCache(load_recipe(path)).scaled(width)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build and inspect the cached source preprocessing pyramid",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Build the pyramid for the default recipe
+  uv run tools/preprocess.py
+
+  # Recipe for the raw photo, then use it as the generators' source
+  uv run tools/preprocess.py my_recipe.json
+  # (set "source" in tools/animation_params.json to my_recipe.json)
+
+  # Drop every cached variant
+  uv run tools/preprocess.py --clear
+        """
+    )
+    parser.add_argument("recipe", nargs="?", default=DEFAULT_RECIPE,
+                        help=f"Recipe .json or source image (default: {DEFAULT_RECIPE})")
+    parser.add_argument("--clear", action="store_true", help=f"Delete {CACHE_DIR}/ and exit")
+    add_profile_args(parser)
+
+    args = parser.parse_args()
+
+    if args.clear:
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        print(f"🧹 Cleared {CACHE_DIR}/")
+        return
+
+    with profile_session("preprocess", args):
+        try:
+            recipe = load_recipe(args.recipe)
+            cache = SourceCache(recipe)
+            with Image.open(recipe["source"]) as img:
+                print(f"🖼️  {recipe['source']}: {img.size[0]}x{img.size[1]} ({img.mode})")
+            paths = cache.build()
+        except (OSError, ValueError) as e:
+            print(f"❌ {e}", file=sys.stderr)
+            sys.exit(1)
+
+    steps = [f"{k}={recipe[k]}" for k in ("crop", "contrast", "gamma", "grayscale")
+             if recipe[k] != RECIPE_DEFAULTS[k]]
+    print(f"   Steps: {', '.join(steps) or 'none'}")
+    print(f"   Cache: {cache.dir}/")
+    for path in paths:
+        with Image.open(path) as img:
+            print(f"     {os.path.basename(path)}: {img.size[0]}x{img.size[1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# /// script
+# dependencies = [
+#   "pillow",
+# ]
+# ///
+
+"""
+Live-reload animation preview server.
+
+Renders animation frames on request from tools/animation_params.json and the
+source image (via animation_render.py), so tweaking parameters no longer
+means regenerating frame directories and GIFs by hand. Scaled sources and
+dithered frames are kept in LRU caches keyed by their parameters; the
+browser is told to reload (via Server-Sent Events) whenever the source image
+or the parameters change, and plays frames at the firmware's
+1000 / ANIMATION_FPS ms tick.
+
+Usage:
+    uv run tools/preview_server.py [--port 8030]
+"""
+
+import os
+import json
+import time
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse
+
+from animation_render import ANIMATIONS, render_frame
+from preprocess import input_mtime_ns
+
+DEFAULT_PARAMS = "tools/animation_params.json"
+DEFAULT_SOURCE = "images/casino.png"  # when the params file names none
+WATCH_INTERVAL = 0.25  # seconds between mtime checks
+
+
+class PreviewState:
+    """Current parameters plus a version bumped on every change"""
+
+    def __init__(self, params_path):
+        self.params_path = params_path
+        self.lock = threading.Condition()
+        self.version = 0
+        self.params = {}
+        self.mtimes = None
+        self.reload()
+
+    def _mtimes(self, params):
+        result = []
+        try:
+            result.append(os.stat(self.params_path).st_mtime_ns)
+        except OSError:
+            result.append(None)
+        try:
+            # For a recipe, changes to the image it names count too
+            result.append(input_mtime_ns(params.get("source", DEFAULT_SOURCE)))
+        except (OSError, TypeError, AttributeError, ValueError):
+            result.append(None)
+        return tuple(result)
+
+    def reload(self):
+        """Re-read params; return True if anything changed"""
+        try:
+            with open(self.params_path, "r") as f:
+                params = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not read {self.params_path}: {e}")
+            params = self.params
+
+        mtimes = self._mtimes(params)
+        with self.lock:
+            if params == self.params and mtimes == self.mtimes:
+                return False
+            self.params = params
+            self.mtimes = mtimes
+            self.version += 1
+            self.lock.notify_all()
+        return True
+
+    def snapshot(self):
+        with self.lock:
+            params = dict(self.params)
+            source_mtime = self.mtimes[1]
+            version = self.version
+        fps = int(params.get("fps", 30))
+        return {
+            "version": version,
+            "source": params.get("source", DEFAULT_SOURCE),
+            "source_mtime_ns": source_mtime,
+            "num_frames": int(params.get("num_frames", 100)),
+            "fps": fps,
+            "tick_ms": 1000 // fps,  # integer division, as in casino_blinder.c
+            "animations": [a for a in params.get("animations", ANIMATIONS) if a in ANIMATIONS],
+        }
+
+    def wait_for_change(self, version, timeout):
+        with self.lock:
+            self.lock.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+
+def watch(state):
+    """Poll the params file and source image for changes"""
+    while True:
+        time.sleep(WATCH_INTERVAL)
+        if state.reload():
+            print(f"🔄 Change detected (version {state.version})")
+
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head><title>Casino Blinder preview</title></head>
+<body style="margin:0;background:#000;color:#ccc;font:12px monospace;display:flex;flex-wrap:wrap;gap:16px;padding:16px">
+<script>
+let timer = null;
+
+async function load() {
+  const params = await (await fetch('/params')).json();
+  document.body.querySelectorAll('figure').forEach(f => f.remove());
+  clearInterval(timer);
+
+  const players = params.animations.map(kind => {
+    const fig = document.createElement('figure');
+    fig.style.margin = 0;
+    const img = document.createElement('img');
+    img.style.cssText = 'image-rendering:pixelated;width:512px;background:#fff';
+    const caption = document.createElement('figcaption');
+    fig.append(img, caption);
+    document.body.append(fig);
+    const frames = [];
+    for (let i = 0; i < params.num_frames; i++) {
+      const frame = new Image();
+      frame.src = `/frame/${kind}/${i}.png?v=${params.version}`;
+      frames.push(frame);
+    }
+    return {kind, img, caption, frames};
+  });
+
+  let frame = 0;
+  timer = setInterval(() => {
+    for (const p of players) {
+      p.img.src = p.frames[frame].src;
+      p.caption.textContent = `${p.kind}  frame ${frame}/${params.num_frames - 1}  ${params.tick_ms} ms`;
+    }
+    frame = (frame + 1) % params.num_frames;
+  }, params.tick_ms);
+}
+
+new EventSource('/events').onmessage = load;
+load();
+</script>
+</body>
+</html>
+"""
+
+
+class PreviewHandler(BaseHTTPRequestHandler):
+    state = None  # set by main()
+
+    def log_message(self, format, *args):
+        pass  # keep the console for change notifications
+
+    def send_body(self, body, content_type, cache=False):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "max-age=3600" if cache else "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+
+        if path == "/":
+            self.send_body(PAGE.encode(), "text/html; charset=utf-8")
+        elif path == "/params":
+            self.send_body(json.dumps(self.state.snapshot()).encode(), "application/json")
+        elif path == "/events":
+            self.serve_events()
+        elif path.startswith("/frame/"):
+            self.serve_frame(path)
+        else:
+            self.send_error(404)
+
+    def serve_frame(self, path):
+        try:
+            _, _, kind, name = path.split("/")
+            frame_num = int(name.removesuffix(".png"))
+        except ValueError:
+            self.send_error(404)
+            return
+
+        params = self.state.snapshot()
+        if kind not in ANIMATIONS or not 0 <= frame_num < params["num_frames"]:
+            self.send_error(404)
+            return
+        if params["source_mtime_ns"] is None:
+            self.send_error(500, f"Source image {params['source']} not found")
+            return
+
+        png = render_frame(params["source"], params["source_mtime_ns"], kind,
+                           params["num_frames"], frame_num)
+        # URLs carry ?v=<version>, so a cached response never goes stale
+        self.send_body(png, "image/png", cache=True)
+
+    def serve_events(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+
+        version = self.state.snapshot()["version"]
+        try:
+            while True:
+                new_version = self.state.wait_for_change(version, timeout=15)
+                if new_version != version:
+                    version = new_version
+                    self.wfile.write(f"data: {version}\n\n".encode())
+                else:
+                    self.wfile.write(b": keepalive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Live-reload animation preview server')
+    parser.add_argument('--port', type=int, default=8030, help='Port to listen on (default: 8030)')
+    parser.add_argument('--params', default=DEFAULT_PARAMS,
+                       help=f'Animation parameters JSON (default: {DEFAULT_PARAMS})')
+    args = parser.parse_args()
+
+    PreviewHandler.state = PreviewState(args.params)
+    threading.Thread(target=watch, args=(PreviewHandler.state,), daemon=True).start()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), PreviewHandler)
+    server.daemon_threads = True
+    params = PreviewHandler.state.snapshot()
+    print(f"🎬 Preview at http://127.0.0.1:{args.port}/")
+    print(f"   Watching {args.params} and {params['source']} (Ctrl+C to stop)")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped")
+
+
+if __name__ == "__main__":
+    main()
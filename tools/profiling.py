@@ -0,0 +1,186 @@
+"""
+Shared per-stage profiling for the tools.
+
+Tools wrap their work in named stages:
+
+    from profiling import stage
+
+    with stage('parse'):
+        header, raw_data = parse_sub_file(path)
+
+Stages are no-ops unless a profiling session is active. With --profile the
+tool records wall time, call count and peak memory (tracemalloc) per stage
+and appends them to a JSON lines file; --cprofile also dumps a cProfile
+profile for the whole run. tracemalloc slows allocation-heavy Python loops
+considerably, so compare profiled times with other profiled runs only.
+"""
+
+import sys
+import json
+import time
+import cProfile
+import tracemalloc
+import contextlib
+from datetime import datetime
+
+DEFAULT_PROFILE_PATH = "profile.jsonl"
+
+_active = None  # the running Session, if any
+
+
+class Session:
+    """Collects stage timings and memory peaks for one tool run"""
+
+    def __init__(self, tool):
+        self.tool = tool
+        self.stages = {}  # name -> {'calls', 'total_s', 'peak_bytes'}
+        self.peaks = []   # running peak per open stage (innermost last)
+        self.peak = 0     # whole-run peak, including time outside stages
+        self.start = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        # reset_peak() is global, so fold the current peak into the enclosing
+        # stage and the run before resetting it for this one
+        _, peak = tracemalloc.get_traced_memory()
+        self.peak = max(self.peak, peak)
+        if self.peaks:
+            self.peaks[-1] = max(self.peaks[-1], peak)
+        tracemalloc.reset_peak()
+        self.peaks.append(0)
+
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - t0
+            _, peak = tracemalloc.get_traced_memory()
+            peak = max(self.peaks.pop(), peak)
+            if self.peaks:
+                self.peaks[-1] = max(self.peaks[-1], peak)
+
+            record = self.stages.setdefault(name, {'calls': 0, 'total_s': 0.0, 'peak_bytes': 0})
+            record['calls'] += 1
+            record['total_s'] += elapsed
+            record['peak_bytes'] = max(record['peak_bytes'], peak)
+
+    def records(self):
+        """Return JSON-serialisable records, one per stage plus a total"""
+        timestamp = datetime.now().isoformat(timespec='seconds')
+        _, peak = tracemalloc.get_traced_memory()
+        peak = max(self.peak, peak)
+        base = {'timestamp': timestamp, 'tool': self.tool}
+
+        records = [dict(base, stage=name, **record) for name, record in self.stages.items()]
+        records.append(dict(base, stage='total', calls=1,
+                            total_s=time.perf_counter() - self.start, peak_bytes=peak))
+        return records
+
+
+@contextlib.contextmanager
+def stage(name):
+    """Time a named stage of the active session (no-op when not profiling)"""
+    if _active is None:
+        yield
+    else:
+        with _active.stage(name):
+            yield
+
+
+def is_active():
+    return _active is not None
+
+
+@contextlib.contextmanager
+def session(tool, profile_path=None, cprofile_path=None):
+    """
+    Profile a tool run.
+
+    Args:
+        tool: Tool name recorded in each JSON line
+        profile_path: JSON lines file to append stage records to (None = off)
+        cprofile_path: Optional cProfile dump path
+    """
+    global _active
+
+    if profile_path is None and cprofile_path is None:
+        yield
+        return
+
+    profiler = None
+    if cprofile_path:
+        profiler = cProfile.Profile()
+
+    tracemalloc.start()
+    _active = Session(tool)
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(cprofile_path)
+        records = _active.records()
+        _active = None
+        tracemalloc.stop()
+
+        if profile_path:
+            with open(profile_path, 'a') as f:
+                for record in records:
+                    f.write(json.dumps(record) + '\n')
+
+        print_summary(records, profile_path, cprofile_path)
+
+
+def print_summary(records, profile_path, cprofile_path):
+    """Print a stage table to stderr (stdout may carry tool output)"""
+    out = sys.stderr
+    print("\n⏱️  Profile", file=out)
+    for record in records:
+        print(f"   {record['stage']:12} {record['calls']:6}x  {record['total_s'] * 1000:10.2f} ms  "
+              f"{record['peak_bytes'] / 1024 / 1024:8.2f} MB", file=out)
+    if profile_path:
+        print(f"   Stage records appended to {profile_path}", file=out)
+    if cprofile_path:
+        print(f"   cProfile dump written to {cprofile_path}", file=out)
+
+
+def add_profile_args(parser):
+    """Add --profile / --profile-file / --cprofile to an argparse parser"""
+    parser.add_argument('--profile', action='store_true',
+                        help='Record per-stage time and peak memory')
+    parser.add_argument('--profile-file', default=DEFAULT_PROFILE_PATH, metavar='JSONL',
+                        help=f'JSON lines file for --profile records (default: {DEFAULT_PROFILE_PATH})')
+    parser.add_argument('--cprofile', default=None, metavar='PATH',
+                        help='Also write a cProfile dump for the whole run')
+
+
+def profile_session(tool, args):
+    """Start a session from the arguments added by add_profile_args()"""
+    return session(tool, args.profile_file if args.profile else None, args.cprofile)
+
+
+def pop_profile_args(argv):
+    """
+    Remove --profile / --profile-file JSONL / --cprofile PATH from argv for
+    tools that read sys.argv directly. Returns (profile_path, cprofile_path).
+    """
+    profile = False
+    profile_path = DEFAULT_PROFILE_PATH
+    cprofile_path = None
+    i = 0
+    while i < len(argv):
+        if argv[i] == '--profile':
+            del argv[i]
+            profile = True
+        elif argv[i] in ('--profile-file', '--cprofile') and i + 1 < len(argv):
+            flag = argv.pop(i)
+            value = argv.pop(i)
+            if flag == '--profile-file':
+                profile_path = value
+            else:
+                cprofile_path = value
+        else:
+            i += 1
+    return (profile_path if profile else None), cprofile_path
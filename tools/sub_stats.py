@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Pulse statistics for Flipper Zero .sub RAW captures
+
+Reads a capture in a single streaming pass (one RAW_Data line at a time) and
+keeps only fixed-size log-scale histograms, so memory stays flat however long
+the capture is. Reports high/low pulse-width histograms and approximate
+quantiles, duty cycle, the distribution of gaps (long low periods), glitches
+shorter than the clean threshold and an estimated bit period - enough to tell
+whether a capture is worth cleaning, encoding or demodulating.
+"""
+
+import sys
+import json
+import math
+import argparse
+
+from profiling import stage, add_profile_args, profile_session
+
+DEFAULT_GLITCH_US = 100  # same as subtool.py clean --min-pulse
+DEFAULT_GAP_US = 5000
+BUCKETS_PER_OCTAVE = 8  # ~9% bucket width
+QUANTILES = (0.01, 0.10, 0.50, 0.90, 0.99)
+PEAK_FRACTION = 0.2  # a bit-period peak needs 20% of the tallest bucket's count
+BAR_WIDTH = 40
+
+
+def iter_sub_timings(filename):
+    """Yield RAW_Data timing values from a .sub file without loading it whole"""
+    with open(filename, 'r') as f:
+        for line in f:
+            if line.startswith('RAW_Data:'):
+                for value in line.split(':', 1)[1].split():
+                    yield int(value)
+
+
+def bucket_of(width_us):
+    """Log-scale histogram bucket of a pulse width (0 us goes in bucket 0)"""
+    if width_us < 1:
+        return 0
+    return int(math.log2(width_us) * BUCKETS_PER_OCTAVE) + 1
+
+
+class Histogram:
+    """Log-scale pulse-width histogram with per-bucket sums for bucket means"""
+
+    def __init__(self):
+        self.counts = {}
+        self.sums = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def add(self, width_us):
+        b = bucket_of(width_us)
+        self.counts[b] = self.counts.get(b, 0) + 1
+        self.sums[b] = self.sums.get(b, 0) + width_us
+        self.count += 1
+        self.total += width_us
+        self.min = width_us if self.min is None else min(self.min, width_us)
+        self.max = width_us if self.max is None else max(self.max, width_us)
+
+    def select(self, low_us=0, high_us=None):
+        """New histogram with only the buckets whose mean lies in [low_us, high_us)"""
+        result = Histogram()
+        for b, count in self.counts.items():
+            mean = self.sums[b] / count
+            if mean >= low_us and (high_us is None or mean < high_us):
+                result.counts[b] = count
+                result.sums[b] = self.sums[b]
+                result.count += count
+                result.total += self.sums[b]
+        if result.count:
+            buckets = sorted(result.counts)
+            result.min = round(result.sums[buckets[0]] / result.counts[buckets[0]])
+            result.max = round(result.sums[buckets[-1]] / result.counts[buckets[-1]])
+        return result
+
+    def quantile(self, q):
+        """Approximate quantile: the mean of the bucket holding it"""
+        if not self.count:
+            return None
+        target = q * (self.count - 1)
+        seen = 0
+        for b in sorted(self.counts):
+            seen += self.counts[b]
+            if seen > target:
+                return round(self.sums[b] / self.counts[b])
+        return self.max
+
+    def octaves(self):
+        """Yield (low_us, high_us, count) per power-of-two range"""
+        merged = {}
+        for b, count in self.counts.items():
+            octave = (b - 1) // BUCKETS_PER_OCTAVE if b else -1
+            merged[octave] = merged.get(octave, 0) + count
+        for octave in sorted(merged):
+            if octave < 0:
+                yield 0, 1, merged[octave]
+            else:
+                yield 2 ** octave, 2 ** (octave + 1), merged[octave]
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'total_us': self.total,
+            'min_us': self.min,
+            'max_us': self.max,
+            'mean_us': round(self.total / self.count, 1) if self.count else None,
+            'quantiles_us': {f"p{round(q * 100)}": self.quantile(q) for q in QUANTILES},
+            'histogram': [{'from_us': lo, 'to_us': hi, 'count': n} for lo, hi, n in self.octaves()],
+        }
+
+
+class PulseStats:
+    """Single-pass accumulator over a stream of timing values"""
+
+    def __init__(self, glitch_us=DEFAULT_GLITCH_US, gap_us=DEFAULT_GAP_US):
+        self.glitch_us = glitch_us
+        self.gap_us = gap_us
+        self.high = Histogram()
+        self.low = Histogram()
+        self.gaps = Histogram()  # exact: low widths >= gap_us, not whole buckets
+        self.values = 0
+        self.zero = 0
+        self.glitches = 0
+        self.same_level = 0
+        self.last_level = None
+
+    def feed(self, timings):
+        for timing in timings:
+            self.values += 1
+            if timing == 0:
+                self.zero += 1
+                continue
+            width = abs(timing)
+            level = timing > 0
+            if width < self.glitch_us:
+                self.glitches += 1
+            if level == self.last_level:
+                self.same_level += 1
+            self.last_level = level
+            (self.high if level else self.low).add(width)
+            if not level and width >= self.gap_us:
+                self.gaps.add(width)
+        return self
+
+    def bit_period_us(self):
+        """
+        Estimate the symbol period as the shortest prominent pulse width.
+
+        Glitches and gaps are ignored. Among the remaining buckets (high and
+        low combined), the first local peak holding at least PEAK_FRACTION
+        of the tallest bucket's count wins; its mean, merged with the
+        neighbouring buckets, is the estimate.
+        """
+        counts = {}
+        sums = {}
+        for hist in (self.high.select(self.glitch_us, self.gap_us),
+                     self.low.select(self.glitch_us, self.gap_us)):
+            for b, count in hist.counts.items():
+                counts[b] = counts.get(b, 0) + count
+                sums[b] = sums.get(b, 0) + hist.sums[b]
+        if not counts:
+            return None
+
+        tallest = max(counts.values())
+        for b in sorted(counts):
+            count = counts[b]
+            if (count >= tallest * PEAK_FRACTION
+                    and count >= counts.get(b - 1, 0) and count >= counts.get(b + 1, 0)):
+                near = [n for n in (b - 1, b, b + 1) if n in counts]
+                return round(sum(sums[n] for n in near) / sum(counts[n] for n in near))
+        return None
+
+    def to_dict(self):
+        total = self.high.total + self.low.total
+        in_bursts = total - self.gaps.total
+        return {
+            'values': self.values,
+            'duration_us': total,
+            'duty_cycle': round(self.high.total / total, 4) if total else None,
+            'burst_duty_cycle': round(self.high.total / in_bursts, 4) if in_bursts else None,
+            'glitch_us': self.glitch_us,
+            'glitches': self.glitches,
+            'zero_values': self.zero,
+            'same_level_runs': self.same_level,
+            'bit_period_us': self.bit_period_us(),
+            'high': self.high.to_dict(),
+            'low': self.low.to_dict(),
+            'gap_us': self.gap_us,
+            'gaps': self.gaps.to_dict(),
+        }
+
+
+def capture_stats(filename, glitch_us=DEFAULT_GLITCH_US, gap_us=DEFAULT_GAP_US):
+    """Stream one capture into a stats dict"""
+    return PulseStats(glitch_us, gap_us).feed(iter_sub_timings(filename)).to_dict()
+
+
+def print_histogram(title, hist):
+    if not hist['count']:
+        print(f"   {title}: none")
+        return
+    q = hist['quantiles_us']
+    print(f"   {title}: {hist['count']} pulses, {hist['min_us']}-{hist['max_us']} μs, "
+          f"mean {hist['mean_us']} μs")
+    print("      " + "  ".join(f"{name} {value}" for name, value in q.items()))
+    peak = max(row['count'] for row in hist['histogram'])
+    for row in hist['histogram']:
+        bar = '█' * max(1, round(row['count'] * BAR_WIDTH / peak))
+        print(f"      {row['from_us']:>7}-{row['to_us']:<7} μs {row['count']:>7}  {bar}")
+
+
+def print_stats(stats):
+    """Human-readable report for one capture"""
+    def pct(value):
+        return f"{value * 100:.1f}%" if value is not None else "n/a"
+
+    print(f"   Duration: {stats['duration_us'] / 1_000_000:.3f} seconds "
+          f"({stats['duration_us']:,} μs), {stats['values']} timing values")
+    print(f"   Duty cycle: {pct(stats['duty_cycle'])} overall, "
+          f"{pct(stats['burst_duty_cycle'])} excluding gaps")
+    bit_period = stats['bit_period_us']
+    print(f"   Estimated bit period: {f'{bit_period} μs' if bit_period else 'n/a'}")
+    print(f"   Glitches < {stats['glitch_us']} μs: {stats['glitches']}"
+          f" (zero values: {stats['zero_values']}, same-level runs: {stats['same_level_runs']})")
+    print_histogram("High", stats['high'])
+    print_histogram("Low", stats['low'])
+    print_histogram(f"Gaps ≥ {stats['gap_us']} μs", stats['gaps'])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Pulse-width statistics for .sub RAW captures (streaming, bounded memory)',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+Examples:
+  # Report for one capture
+  python3 sub_stats.py signals/Cas_d_1.sub
+
+  # Machine-readable report for several captures
+  python3 sub_stats.py signals/*.sub --json > stats.json
+
+  # Treat anything under 150 us as a glitch and 20 ms of silence as a gap
+  python3 sub_stats.py capture.sub --glitch-us 150 --gap-us 20000
+        '''
+    )
+    parser.add_argument('inputs', nargs='+', help='Input .sub files')
+    parser.add_argument('--glitch-us', type=int, default=DEFAULT_GLITCH_US,
+                       help=f'Pulses shorter than this count as glitches (default: {DEFAULT_GLITCH_US})')
+    parser.add_argument('--gap-us', type=int, default=DEFAULT_GAP_US,
+                       help=f'Low periods at least this long count as gaps (default: {DEFAULT_GAP_US})')
+    parser.add_argument('--json', action='store_true',
+                       help='Print a JSON object keyed by input file')
+    add_profile_args(parser)
+
+    args = parser.parse_args()
+
+    results = {}
+    failures = 0
+    with profile_session('sub_stats', args):
+        for path in args.inputs:
+            try:
+                with stage('stats'):
+                    results[path] = capture_stats(path, args.glitch_us, args.gap_us)
+            except (OSError, ValueError) as e:
+                print(f"❌ {path}: {e}", file=sys.stderr)
+                failures += 1
+                continue
+            if not results[path]['values']:
+                print(f"❌ {path}: No RAW_Data found in file!", file=sys.stderr)
+                del results[path]
+                failures += 1
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        for path, stats in results.items():
+            print(f"📡 {path}")
+            print_stats(stats)
+            print()
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,8 @@ Convert Flipper Zero .sub RAW files to C arrays for embedding in code
 
 import sys
 
+from profiling import stage, session, pop_profile_args
+
 def parse_sub_file(filename):
     """Parse a .sub file and return frequency, preset, and RAW timing data"""
     frequency = None
@@ -40,9 +42,9 @@ def generate_c_array(name, raw_data):
 
     return "\n".join(lines)
 
-def main():
+def run():
     if len(sys.argv) < 3:
-        print("Usage: python3 sub_to_c_array.py <signal1.sub> <signal2.sub>")
+        print("Usage: python3 sub_to_c_array.py <signal1.sub> <signal2.sub> [--profile]")
         sys.exit(1)
 
     signal1_file = sys.argv[1]
@@ -54,19 +56,28 @@ def main():
     print()
 
     # Parse signal 1
-    freq1, preset1, data1 = parse_sub_file(signal1_file)
+    with stage('parse'):
+        freq1, preset1, data1 = parse_sub_file(signal1_file)
     print(f"// Frequency: {freq1} Hz, Preset: {preset1}")
-    print(generate_c_array("signal_up_raw", data1))
+    with stage('encode'):
+        print(generate_c_array("signal_up_raw", data1))
     print()
 
     # Parse signal 2
-    freq2, preset2, data2 = parse_sub_file(signal2_file)
+    with stage('parse'):
+        freq2, preset2, data2 = parse_sub_file(signal2_file)
     print(f"// Frequency: {freq2} Hz, Preset: {preset2}")
-    print(generate_c_array("signal_down_raw", data2))
+    with stage('encode'):
+        print(generate_c_array("signal_down_raw", data2))
     print()
 
     print(f"#define SUBGHZ_FREQUENCY {freq1}")
     print(f"#define SUBGHZ_PRESET FuriHalSubGhzPresetOok650Async")
 
+def main():
+    profile_path, cprofile_path = pop_profile_args(sys.argv)
+    with session('sub_to_c_array', profile_path, cprofile_path):
+        run()
+
 if __name__ == '__main__':
     main()
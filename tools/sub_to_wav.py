@@ -8,6 +8,8 @@ import wave
 import struct
 import re
 
+from profiling import stage, session, pop_profile_args
+
 def parse_sub_file(filename):
     """Parse a .sub file and extract RAW timing data"""
     raw_data = []
@@ -31,37 +33,39 @@ def raw_to_wav(raw_data, output_file, sample_rate=44100):
         sample_rate: Audio sample rate (Hz)
     """
 
-    # Convert timing (microseconds) to samples
-    samples = []
-
-    for timing in raw_data:
-        # Convert microseconds to seconds, then to number of samples
-        duration_sec = abs(timing) / 1_000_000
-        num_samples = int(duration_sec * sample_rate)
+    with stage('encode'):
+        # Convert timing (microseconds) to samples
+        samples = []
 
-        # Positive timing = high signal, negative = low signal
-        if timing > 0:
-            samples.extend([32767] * num_samples)  # Max amplitude
-        else:
-            samples.extend([0] * num_samples)      # Zero amplitude
+        for timing in raw_data:
+            # Convert microseconds to seconds, then to number of samples
+            duration_sec = abs(timing) / 1_000_000
+            num_samples = int(duration_sec * sample_rate)
 
-    # Write WAV file
-    with wave.open(output_file, 'w') as wav:
-        wav.setnchannels(1)  # Mono
-        wav.setsampwidth(2)  # 16-bit
-        wav.setframerate(sample_rate)
+            # Positive timing = high signal, negative = low signal
+            if timing > 0:
+                samples.extend([32767] * num_samples)  # Max amplitude
+            else:
+                samples.extend([0] * num_samples)      # Zero amplitude
 
         # Pack samples as 16-bit integers
         packed = struct.pack('<' + 'h' * len(samples), *samples)
-        wav.writeframes(packed)
+
+    # Write WAV file
+    with stage('write'):
+        with wave.open(output_file, 'w') as wav:
+            wav.setnchannels(1)  # Mono
+            wav.setsampwidth(2)  # 16-bit
+            wav.setframerate(sample_rate)
+            wav.writeframes(packed)
 
     print(f"✅ Converted {len(raw_data)} timing values to {output_file}")
     print(f"   Total samples: {len(samples)}")
     print(f"   Duration: {len(samples) / sample_rate:.3f} seconds")
 
-def main():
+def run():
     if len(sys.argv) < 2:
-        print("Usage: python3 sub_to_wav.py <input.sub> [output.wav]")
+        print("Usage: python3 sub_to_wav.py <input.sub> [output.wav] [--profile]")
         print("\nExample:")
         print("  python3 sub_to_wav.py my_signal.sub my_signal.wav")
         sys.exit(1)
@@ -70,7 +74,8 @@ def main():
     output_file = sys.argv[2] if len(sys.argv) > 2 else input_file.replace('.sub', '.wav')
 
     print(f"📡 Parsing {input_file}...")
-    raw_data = parse_sub_file(input_file)
+    with stage('parse'):
+        raw_data = parse_sub_file(input_file)
 
     if not raw_data:
         print("❌ No RAW_Data found in file!")
@@ -82,5 +87,10 @@ def main():
     print(f"\n🎵 Open {output_file} in Audacity to visualize!")
     print("   Tip: In Audacity, use View → Zoom to see individual pulses")
 
+def main():
+    profile_path, cprofile_path = pop_profile_args(sys.argv)
+    with session('sub_to_wav', profile_path, cprofile_path):
+        run()
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Batch-process Flipper Zero .sub RAW captures with chained stages
+
+Each input is parsed once and passed through the stages in order, so
+`trim ... wav carray` replaces separate trim_sub.py / sub_to_wav.py /
+sub_to_c_array.py runs. Inputs can be files, globs or directories, and
+separate files are processed in parallel.
+"""
+
+import io
+import os
+import sys
+import glob
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+
+from trim_sub import parse_sub_file, calculate_timestamps, trim_signal, write_sub_file
+from sub_to_wav import raw_to_wav
+from sub_to_c_array import generate_c_array
+from sub_stats import PulseStats, print_stats
+from profiling import stage, add_profile_args, profile_session
+
+
+class Capture:
+    """A parsed .sub capture moving through the stage chain"""
+
+    def __init__(self, path, header, raw_data):
+        self.path = path
+        self.header = header
+        self.raw_data = raw_data
+        self.stem = os.path.splitext(os.path.basename(path))[0]
+        self.suffix = ''  # grows as stages modify the data, e.g. "_trimmed"
+
+    def output_path(self, out_dir, ext):
+        directory = out_dir or os.path.dirname(self.path)
+        return os.path.join(directory, f"{self.stem}{self.suffix}{ext}")
+
+
+def clean_signal(raw_data, min_pulse_us):
+    """
+    Remove glitches shorter than min_pulse_us and merge same-level runs.
+
+    A glitch is absorbed into the pulse before it, so the total duration
+    and the timing of everything after it are unchanged.
+    """
+    cleaned = []
+    for timing in raw_data:
+        if timing == 0:
+            continue
+        if cleaned and abs(timing) < min_pulse_us:
+            last = cleaned[-1]
+            cleaned[-1] = last + abs(timing) if last > 0 else last - abs(timing)
+            continue
+        if cleaned and (cleaned[-1] > 0) == (timing > 0):
+            cleaned[-1] += timing
+            continue
+        cleaned.append(timing)
+    return cleaned
+
+
+def stage_info(capture, args, out_dir):
+    timestamps = calculate_timestamps(capture.raw_data)
+    total_us = timestamps[-1]
+    print(f"   Signal duration: {total_us / 1_000_000:.3f} seconds ({total_us:,} μs)")
+    print(f"   Total timing values: {len(capture.raw_data)}")
+
+
+def stage_stats(capture, args, out_dir):
+    print_stats(PulseStats(args.glitch_us, args.gap_us).feed(capture.raw_data).to_dict())
+
+
+def stage_trim(capture, args, out_dir):
+    capture.raw_data = trim_signal(capture.raw_data, args.start, args.end)
+    capture.suffix += '_trimmed'
+    print(f"   ✂️  Trimmed to {len(capture.raw_data)} timing values")
+
+
+def stage_clean(capture, args, out_dir):
+    before = len(capture.raw_data)
+    capture.raw_data = clean_signal(capture.raw_data, args.min_pulse)
+    capture.suffix += '_clean'
+    print(f"   🧹 Cleaned {before} → {len(capture.raw_data)} timing values")
+
+
+def stage_sub(capture, args, out_dir):
+    output = capture.output_path(out_dir, '.sub')
+    if os.path.abspath(output) == os.path.abspath(capture.path):
+        print(f"   ⚠️  Not overwriting input {output}")
+        return
+    write_sub_file(output, capture.header, capture.raw_data)
+    print(f"   💾 {output}")
+
+
+def stage_wav(capture, args, out_dir):
+    raw_to_wav(capture.raw_data, capture.output_path(out_dir, '.wav'), args.rate)
+
+
+def stage_carray(capture, args, out_dir):
+    name = args.name or ''.join(c if c.isalnum() else '_' for c in capture.stem.lower()) + '_raw'
+    output = capture.output_path(out_dir, '.h')
+    with open(output, 'w') as f:
+        f.write(f"// Auto-generated from {os.path.basename(capture.path)}\n\n")
+        f.write(generate_c_array(name, capture.raw_data))
+        f.write("\n")
+    print(f"   💾 {output} ({name})")
+
+
+def build_stage_parsers():
+    """Return {stage_name: (parser, handler)}"""
+    stages = {}
+
+    p = argparse.ArgumentParser(prog='info', description='Print duration and value count')
+    stages['info'] = (p, stage_info)
+
+    p = argparse.ArgumentParser(prog='stats', description='Pulse-width histograms, duty cycle, glitches and bit period')
+    p.add_argument('--glitch-us', type=int, default=100, help='Glitch threshold in microseconds (default: 100)')
+    p.add_argument('--gap-us', type=int, default=5000, help='Minimum gap length in microseconds (default: 5000)')
+    stages['stats'] = (p, stage_stats)
+
+    p = argparse.ArgumentParser(prog='trim', description='Trim by microsecond timestamps')
+    p.add_argument('-s', '--start', type=int, default=0, help='Start time in microseconds')
+    p.add_argument('-e', '--end', type=int, default=None, help='End time in microseconds')
+    stages['trim'] = (p, stage_trim)
+
+    p = argparse.ArgumentParser(prog='clean', description='Absorb glitches and merge same-level runs')
+    p.add_argument('--min-pulse', type=int, default=100, help='Glitch threshold in microseconds (default: 100)')
+    stages['clean'] = (p, stage_clean)
+
+    p = argparse.ArgumentParser(prog='sub', description='Write the current data as a .sub file')
+    stages['sub'] = (p, stage_sub)
+
+    p = argparse.ArgumentParser(prog='wav', description='Write a WAV for Audacity')
+    p.add_argument('--rate', type=int, default=44100, help='Sample rate in Hz (default: 44100)')
+    stages['wav'] = (p, stage_wav)
+
+    p = argparse.ArgumentParser(prog='carray', description='Write a C header with the timing array')
+    p.add_argument('--name', default=None, help='Array name (default: derived from file name)')
+    stages['carray'] = (p, stage_carray)
+
+    return stages
+
+
+STAGES = build_stage_parsers()
+
+
+def value_options(parser):
+    """Option strings of a parser that take a value (e.g. -o, --name)"""
+    return {option for action in parser._actions if action.nargs != 0
+            for option in action.option_strings}
+
+
+def split_chain(argv, global_options=()):
+    """
+    Split argv into (global args, [(stage, stage args)]) at stage names.
+
+    A token that is the value of the option before it (global_options
+    before the chain, the stage's own options inside it) never starts a
+    stage, so "-o wav" is an output directory, not the wav stage.
+    """
+    global_args = []
+    chain = []
+    is_value = False
+    for token in argv:
+        if token in STAGES and not is_value:
+            chain.append((token, []))
+            continue
+        if chain:
+            chain[-1][1].append(token)
+            options = value_options(STAGES[chain[-1][0]][0])
+        else:
+            global_args.append(token)
+            options = global_options
+        is_value = not is_value and token in options
+    return global_args, chain
+
+
+def expand_inputs(patterns, recursive=False):
+    """Expand files, globs and directories into a sorted list of .sub files"""
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            sub_glob = os.path.join(pattern, '**', '*.sub') if recursive else os.path.join(pattern, '*.sub')
+            files.extend(glob.glob(sub_glob, recursive=recursive))
+        elif glob.has_magic(pattern):
+            files.extend(glob.glob(pattern, recursive=recursive))
+        else:
+            files.append(pattern)
+    return sorted(set(files))
+
+
+def process_file(path, chain, out_dir):
+    """Parse one capture and run the chain; return (ok, captured output)"""
+    buffer = io.StringIO()
+    ok = True
+    with contextlib.redirect_stdout(buffer):
+        print(f"📡 {path}")
+        try:
+            with stage('parse'):
+                header, raw_data = parse_sub_file(path)
+            if not raw_data:
+                print("   ❌ No RAW_Data found in file!")
+                return False, buffer.getvalue()
+            capture = Capture(path, header, raw_data)
+            for name, args in chain:
+                with stage(name):
+                    STAGES[name][1](capture, args, out_dir)
+        except (OSError, ValueError) as e:
+            print(f"   ❌ {e}")
+            ok = False
+        except Exception as e:
+            # Anything else is still one bad file, not the end of the batch
+            print(f"   ❌ {type(e).__name__}: {e}")
+            ok = False
+    return ok, buffer.getvalue()
+
+
+def main():
+    stage_list = ', '.join(STAGES)
+    parser = argparse.ArgumentParser(
+        description='Batch-process .sub captures through a chain of stages',
+        usage='%(prog)s [options] INPUT... STAGE [stage options] [STAGE ...]',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f'''
+Stages: {stage_list}
+Run "%(prog)s STAGE -h" for stage options.
+
+Examples:
+  # Duration of every capture in signals/
+  python3 subtool.py signals/ info
+
+  # Check a trim before writing it
+  python3 subtool.py signals/Cas_d_1.sub trim -s 0 -e 750000 stats sub
+
+  # Trim, then write the trimmed .sub, WAV and C header in one pass
+  python3 subtool.py signals/Cas_d_1.sub trim -s 0 -e 750000 sub wav carray
+
+  # Clean all raw captures in parallel into out/
+  python3 subtool.py 'captures/**/*.sub' -r -o out clean --min-pulse 80 sub wav
+        '''
+    )
+    parser.add_argument('inputs', nargs='+', help='.sub files, globs or directories')
+    parser.add_argument('-o', '--out-dir', default=None,
+                       help='Output directory (default: next to each input)')
+    parser.add_argument('-r', '--recursive', action='store_true',
+                       help='Recurse into directories and ** globs')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count(),
+                       help='Parallel worker processes (default: CPU count)')
+    add_profile_args(parser)
+
+    argv = sys.argv[1:]
+    if argv and argv[0] in STAGES:
+        # "subtool.py trim -h" shows stage help
+        STAGES[argv[0]][0].parse_args(argv[1:])
+        parser.error("inputs must come before the stage chain")
+
+    global_argv, chain_argv = split_chain(argv, value_options(parser))
+    args = parser.parse_args(global_argv)
+
+    if not chain_argv:
+        parser.error(f"no stages given (choose from {stage_list})")
+
+    chain = [(name, STAGES[name][0].parse_args(stage_argv)) for name, stage_argv in chain_argv]
+
+    files = expand_inputs(args.inputs, args.recursive)
+    if not files:
+        print("❌ No .sub files matched!")
+        sys.exit(1)
+
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+
+    jobs = max(1, min(args.jobs or 1, len(files)))
+    if args.profile or args.cprofile:
+        # Stages run in workers are invisible to the profiler
+        jobs = 1
+    print(f"🔧 {len(files)} file(s), chain: {' → '.join(name for name, _ in chain)}, {jobs} worker(s)\n")
+
+    failures = 0
+    with profile_session('subtool', args), contextlib.ExitStack() as stack:
+        if jobs == 1:
+            results = (process_file(path, chain, args.out_dir) for path in files)
+        else:
+            pool = stack.enter_context(ProcessPoolExecutor(max_workers=jobs))
+            results = pool.map(process_file, files,
+                               [chain] * len(files), [args.out_dir] * len(files))
+        for ok, output in results:
+            print(output)
+            failures += not ok
+
+    if failures:
+        print(f"❌ {failures} of {len(files)} file(s) failed")
+        sys.exit(1)
+
+    print(f"✅ Processed {len(files)} file(s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -9,6 +9,8 @@ Useful after visualizing in Audacity to identify which parts you want to keep.
 import sys
 import argparse
 
+from profiling import stage, add_profile_args, profile_session
+
 def parse_sub_file(filename):
     """Parse a .sub file and return header + RAW timing data"""
     header_lines = []
@@ -129,11 +131,17 @@ Timestamps are in microseconds (1 second = 1,000,000 microseconds)
                        help='Output .sub file')
     parser.add_argument('--info', action='store_true',
                        help='Show signal duration info and exit')
+    add_profile_args(parser)
 
     args = parser.parse_args()
 
+    with profile_session('trim_sub', args):
+        run(args)
+
+def run(args):
     print(f"📡 Parsing {args.input}...")
-    header, raw_data = parse_sub_file(args.input)
+    with stage('parse'):
+        header, raw_data = parse_sub_file(args.input)
 
     if not raw_data:
         print("❌ No RAW_Data found in file!")
@@ -153,7 +161,8 @@ Timestamps are in microseconds (1 second = 1,000,000 microseconds)
 
     # Trim the signal
     print(f"\n✂️  Trimming from {args.start:,}μs to {args.end:,}μs" if args.end else f"\n✂️  Trimming from {args.start:,}μs to end")
-    trimmed = trim_signal(raw_data, args.start, args.end)
+    with stage('trim'):
+        trimmed = trim_signal(raw_data, args.start, args.end)
 
     trimmed_duration_us = sum(abs(t) for t in trimmed)
     trimmed_duration_sec = trimmed_duration_us / 1_000_000
@@ -163,7 +172,8 @@ Timestamps are in microseconds (1 second = 1,000,000 microseconds)
 
     # Write output
     print(f"\n💾 Writing {args.output}...")
-    write_sub_file(args.output, header, trimmed)
+    with stage('write'):
+        write_sub_file(args.output, header, trimmed)
 
     print("✅ Done!")
     print(f"\nYou can now use {args.output} in your Flipper Zero app")
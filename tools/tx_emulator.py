@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Emulate the Flipper Zero async TX yield loop on the host
+
+subghz_devices_start_async_tx() pulls the signal one LevelDuration at a time
+from a callback. This tool drives a signal through the same yield loop so
+timing problems (pulses the radio can't produce, slow callbacks) show up
+before flashing, e.g. in CI.
+"""
+
+import re
+import sys
+import time
+import argparse
+
+from trim_sub import parse_sub_file
+from profiling import stage, add_profile_args, profile_session
+
+# Shortest pulse the CC1101 async TX path reproduces reliably (microseconds)
+DEFAULT_MIN_PULSE_US = 50
+
+C_ARRAY_RE = re.compile(r'static const int32_t (\w+)\[\] = \{(.*?)\};', re.S)
+# Loop descriptor tables written by build_playlist.py --carray
+LOOPS_RE = re.compile(r'static const SignalLoop (\w+)_loops\[\] = \{(.*?)\};', re.S)
+LOOP_ENTRY_RE = re.compile(r'\{\s*(\d+),\s*(\d+),\s*(\d+),\s*(\d+),\s*(\d+)\s*\}')
+LOOP_FIELDS = ('offset', 'count', 'repeat', 'gap_us', 'next_gap_us')
+
+
+def parse_c_header(filename):
+    """Parse a generated signals.h and return {array_name: timing values}"""
+    with open(filename, 'r') as f:
+        text = f.read()
+
+    arrays = {}
+    for name, body in C_ARRAY_RE.findall(text):
+        arrays[name] = [int(v) for v in body.replace(',', ' ').split()]
+
+    return arrays
+
+
+def parse_loop_tables(filename):
+    """Return {array_name: [loop dicts]} for the SignalLoop tables in a playlist header"""
+    with open(filename, 'r') as f:
+        text = f.read()
+
+    return {
+        f"{name}_raw": [dict(zip(LOOP_FIELDS, (int(v) for v in entry)))
+                        for entry in LOOP_ENTRY_RE.findall(body)]
+        for name, body in LOOPS_RE.findall(text)
+    }
+
+
+class RawSource:
+    """
+    Yield source over a flat timing array (positive = ON, negative = OFF).
+
+    Mirrors the firmware callback: a cursor into a const array, one
+    LevelDuration per call, None (level_duration_reset) when exhausted.
+    """
+
+    def __init__(self, raw_data):
+        self.raw_data = raw_data
+        self.index = 0
+
+    def yield_next(self):
+        if self.index >= len(self.raw_data):
+            return None
+        timing = self.raw_data[self.index]
+        self.index += 1
+        return timing > 0, abs(timing)
+
+
+class ChunkedSource:
+    """
+    Yield source over a list of timing arrays played back to back.
+
+    Matches firmware that keeps one array per RAW_Data line (or per chunk)
+    and advances a (chunk, offset) cursor instead of a flat index.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = [c for c in chunks if c]
+        self.chunk = 0
+        self.offset = 0
+
+    def yield_next(self):
+        if self.chunk >= len(self.chunks):
+            return None
+        timing = self.chunks[self.chunk][self.offset]
+        self.offset += 1
+        if self.offset >= len(self.chunks[self.chunk]):
+            self.chunk += 1
+            self.offset = 0
+        return timing > 0, abs(timing)
+
+
+class LoopSource:
+    """
+    Async TX yield source over loop descriptors.
+
+    Same walk the firmware callback does: (loop, repeat, index) cursor into
+    the shared array, with one merged OFF yield at each seam.
+    """
+
+    def __init__(self, data, loops):
+        self.data = data
+        self.loops = loops
+        self.loop = 0
+        self.rep = 0
+        self.index = 0
+
+    def yield_next(self):
+        while self.loop < len(self.loops):
+            loop = self.loops[self.loop]
+
+            if self.index < loop['count']:
+                timing = self.data[loop['offset'] + self.index]
+                self.index += 1
+                return timing > 0, abs(timing)
+
+            self.index = 0
+            last = self.rep == loop['repeat'] - 1
+            gap_us = loop['next_gap_us'] if last else loop['gap_us']
+            if last:
+                self.loop += 1
+                self.rep = 0
+            else:
+                self.rep += 1
+            if gap_us:
+                return False, gap_us
+
+        return None
+
+
+def emulate(source, min_pulse_us=DEFAULT_MIN_PULSE_US, max_yields=None):
+    """
+    Run a yield source to completion the way the async TX driver would.
+
+    Args:
+        source: Object with yield_next() -> (level, duration_us) or None
+        min_pulse_us: Hardware minimum pulse length in microseconds
+        max_yields: Safety cap on callback invocations (None = unlimited)
+
+    Returns:
+        Dict with yield count, emitted duration, per-yield work and violations
+    """
+    yields = 0
+    total_us = 0
+    work_total_ns = 0
+    work_max_ns = 0
+    short_pulses = []
+    zero_pulses = []
+    same_level = []
+    last_level = None
+
+    while max_yields is None or yields < max_yields:
+        t0 = time.perf_counter_ns()
+        result = source.yield_next()
+        work_ns = time.perf_counter_ns() - t0
+
+        if result is None:
+            break
+
+        level, duration = result
+        work_total_ns += work_ns
+        work_max_ns = max(work_max_ns, work_ns)
+
+        if duration == 0:
+            zero_pulses.append((yields, total_us))
+        elif duration < min_pulse_us:
+            short_pulses.append((yields, total_us, level, duration))
+
+        # Two yields at the same level merge into one longer pulse on air
+        if level == last_level:
+            same_level.append((yields, total_us, level))
+
+        last_level = level
+        total_us += duration
+        yields += 1
+
+    return {
+        'yields': yields,
+        'duration_us': total_us,
+        'work_total_ns': work_total_ns,
+        'work_mean_ns': work_total_ns / yields if yields else 0,
+        'work_max_ns': work_max_ns,
+        'min_pulse_us': min_pulse_us,
+        'short_pulses': short_pulses,
+        'zero_pulses': zero_pulses,
+        'same_level': same_level,
+        'truncated': max_yields is not None and yields >= max_yields,
+    }
+
+
+def print_report(name, report, max_listed=10, file=None):
+    """Print a human-readable emulation report; return True if clean"""
+    file = file or sys.stdout
+    duration_sec = report['duration_us'] / 1_000_000
+    print(f"📡 {name}", file=file)
+    print(f"   Yields: {report['yields']:,}", file=file)
+    print(f"   Emitted duration: {duration_sec:.3f} seconds ({report['duration_us']:,} μs)", file=file)
+    print(f"   Per-yield work: mean {report['work_mean_ns']:.0f} ns, max {report['work_max_ns']:,} ns", file=file)
+
+    ok = True
+
+    if report['truncated']:
+        print("   ⚠️  Stopped at --max-yields before the source ended", file=file)
+        ok = False
+
+    if report['zero_pulses']:
+        ok = False
+        print(f"   ❌ {len(report['zero_pulses'])} zero-length pulses", file=file)
+        for index, at_us in report['zero_pulses'][:max_listed]:
+            print(f"      #{index} at {at_us:,}μs", file=file)
+
+    if report['short_pulses']:
+        ok = False
+        print(f"   ❌ {len(report['short_pulses'])} pulses shorter than {report['min_pulse_us']}μs", file=file)
+        for index, at_us, level, duration in report['short_pulses'][:max_listed]:
+            print(f"      #{index} at {at_us:,}μs: {'ON' if level else 'OFF'} {duration}μs", file=file)
+
+    if report['same_level']:
+        print(f"   ⚠️  {len(report['same_level'])} consecutive yields with the same level (merged on air)", file=file)
+
+    if ok:
+        print("   ✅ Timing within budget", file=file)
+
+    return ok
+
+
+def load_sources(path, chunked=False):
+    """
+    Return [(name, source)] for a .sub file or a generated C header.
+
+    Arrays with a <name>_loops table (build_playlist.py --carray) are
+    walked through their loop descriptors, as the firmware plays them.
+    """
+    if path.endswith('.h'):
+        loop_tables = parse_loop_tables(path)
+        return [(f"{path}:{name}",
+                 LoopSource(data, loop_tables[name]) if name in loop_tables else RawSource(data))
+                for name, data in parse_c_header(path).items()]
+
+    if chunked:
+        chunks = []
+        with open(path, 'r') as f:
+            for line in f:
+                if line.startswith('RAW_Data:'):
+                    chunks.append([int(v) for v in line.split(':', 1)[1].split()])
+        return [(path, ChunkedSource(chunks))]
+
+    _, raw_data = parse_sub_file(path)
+    return [(path, RawSource(raw_data))]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Emulate the Flipper Zero async TX yield loop on a signal',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='''
+Examples:
+  # Check both arrays in the generated header
+  python3 tx_emulator.py signals/signals.h
+
+  # Check a playlist header, loops and seam gaps included
+  python3 tx_emulator.py combo.h
+
+  # Walk a capture line-by-line like a chunked firmware source
+  python3 tx_emulator.py signals/Cas_d_1_trimmed.sub --chunked
+
+  # Stricter hardware minimum
+  python3 tx_emulator.py signals/signals.h --min-pulse 80
+
+Exits with status 1 if any signal violates the timing budget.
+        '''
+    )
+
+    parser.add_argument('inputs', nargs='+', help='.sub files or generated .h headers')
+    parser.add_argument('--min-pulse', type=int, default=DEFAULT_MIN_PULSE_US,
+                       help=f'Minimum pulse length in microseconds (default: {DEFAULT_MIN_PULSE_US})')
+    parser.add_argument('--chunked', action='store_true',
+                       help='Feed .sub files one RAW_Data line at a time')
+    parser.add_argument('--max-yields', type=int, default=None,
+                       help='Stop after this many callback invocations')
+    add_profile_args(parser)
+
+    args = parser.parse_args()
+
+    all_ok = True
+    with profile_session('tx_emulator', args):
+        for path in args.inputs:
+            with stage('parse'):
+                sources = load_sources(path, args.chunked)
+            if not sources:
+                print(f"❌ No signal data found in {path}!")
+                all_ok = False
+                continue
+
+            for name, source in sources:
+                with stage('emulate'):
+                    report = emulate(source, args.min_pulse, args.max_yields)
+                all_ok = print_report(name, report) and all_ok
+                print()
+
+    sys.exit(0 if all_ok else 1)
+
+
+if __name__ == '__main__':
+    main()